@@ -1,18 +1,205 @@
-from abc import ABC, abstractmethod
+import importlib
+import os
+import re
+from abc import ABCMeta
+from typing import Any, Callable, Dict, Optional, Tuple, Type
 
+_MISSING = object()
+# Every datatype by name, filled as the datatype classes are created.
+_TYPES: Dict[str, Type["BaseType"]] = {}
+
+
+class LazyPayload:
+    """Payload field whose value is read from the item's payload file or pack on first access."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self, instance: Optional["BaseType"], owner: type) -> Any:
+        if instance is None:
+            return self
+        value = instance._payload
+        if value is None:
+            payload_path = instance._payload_path
+            if payload_path is None:
+                return ""
+            if isinstance(payload_path, str):
+                with open(payload_path, "r", encoding="utf-8") as file:
+                    value = file.read()
+            else:
+                value = payload_path.read()
+            instance._payload = value
+        return value
+
+    def __set__(self, instance: "BaseType", value: Any) -> None:
+        instance._payload = value
+
+
+class RecordType(ABCMeta):
+    """Metaclass that compiles the annotated fields of a datatype.
+
+    Every annotated field (except ``data_type`` and upper-case constants) becomes a slot, so
+    items carry no per-instance ``__dict__``, and its class-level value becomes the default.
+    Mutable defaults are copied for every item. From the fields, the metaclass generates a
+    ``to_dict`` and a ``load`` per datatype that read and write each field directly, and
+    registers the datatype under its name for ``BaseType.type_for``.
+    """
+
+    def __new__(mcs, name: str, bases: tuple, namespace: dict, **kwargs: Any) -> type:
+        defaults = {}
+        slots = []
+        for field in namespace.get("__annotations__", {}):
+            if field == "data_type" or field.isupper():
+                continue
+            value = namespace.get(field, _MISSING)
+            if isinstance(value, LazyPayload):
+                # The payload descriptor stays on the class and keeps its value in the _payload slot.
+                continue
+            slots.append(field)
+            if value is not _MISSING:
+                defaults[field] = namespace.pop(field)
+        namespace.setdefault("__slots__", tuple(slots))
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+
+        inherited = getattr(cls, "_DEFAULTS", {})
+        cls._DEFAULTS = {**inherited, **defaults}
+        cls._FIELDS = mcs._collect_fields(cls)
+        if bases:
+            cls.to_dict = mcs._compile_to_dict(cls)
+            cls._from_dict = classmethod(mcs._compile_from_dict(cls))
+            _TYPES[name] = cls
+        return cls
+
+    @staticmethod
+    def _collect_fields(cls: type) -> Tuple[str, ...]:
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for field in vars(klass).get("__annotations__", {}):
+                if field != "data_type" and not field.isupper() and field not in fields:
+                    fields.append(field)
+        return tuple(fields)
+
+    @staticmethod
+    def _compile_to_dict(cls: type) -> Callable[[Any], dict]:
+        entries = ", ".join(f"{field!r}: self.{field}" for field in cls._FIELDS)
+        source = f"def to_dict(self):\n    return {{'data_type': {cls.__name__!r}, {entries}}}\n"
+        return _compile(source, "to_dict", {})
+
+    @staticmethod
+    def _compile_from_dict(cls: type) -> Callable[[type, dict], Any]:
+        lines = ["def _from_dict(cls, data):", "    self = _new(cls)", "    self._payload_path = None"]
+        payload_field = cls.PAYLOAD_FIELD
+        scope: Dict[str, Any] = {"_new": object.__new__, "_copy": _copy}
+        for field in cls._FIELDS:
+            if field == payload_field:
+                lines.append(f"    self._payload = data.get({field!r})")
+                continue
+            default = cls._DEFAULTS.get(field, _MISSING)
+            scope[f"_default_{field}"] = default
+            if isinstance(default, (list, dict, set)):
+                lines.append(f"    self.{field} = data[{field!r}] if {field!r} in data else _copy(_default_{field})")
+            elif default is _MISSING:
+                lines.append(f"    if {field!r} in data:")
+                lines.append(f"        self.{field} = data[{field!r}]")
+            else:
+                lines.append(f"    self.{field} = data.get({field!r}, _default_{field})")
+        lines.append("    return self")
+        return _compile("\n".join(lines) + "\n", "_from_dict", scope)
+
+
+def _copy(value: Any) -> Any:
+    return type(value)(value)
+
+
+def _compile(source: str, name: str, scope: Dict[str, Any]) -> Callable:
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<datatype {name}>", "exec"), scope, namespace)
+    return namespace[name]
+
+
+class BaseType(metaclass=RecordType):
+    __slots__ = ("_payload", "_payload_path")
 
-class BaseType(ABC):
     data_type: str = ""
+    # Name of the field stored in the payload file instead of the record, and the file extension.
+    PAYLOAD_FIELD: Optional[str] = None
+    PAYLOAD_EXTENSION: str = "txt"
 
-    @abstractmethod
-    def _save_all(self, file_path: str) -> None:
-        pass
+    def __new__(cls, *args: Any, **kwargs: Any) -> "BaseType":
+        instance = super().__new__(cls)
+        instance._payload = None
+        instance._payload_path = None
+        for field, default in cls._DEFAULTS.items():
+            setattr(instance, field, _copy(default) if isinstance(default, (list, dict, set)) else default)
+        return instance
 
-    @abstractmethod
-    def save_payload(self, file_path: str, content: str) -> None:
-        pass
+    @staticmethod
+    def type_for(data_type: str) -> Optional[Type["BaseType"]]:
+        """Get the datatype class with a given name, importing its module on first use.
+
+        Args:
+            data_type: The class name, such as "AmazonProduct".
+
+        Returns:
+            The class, or None if no datatype has that name.
+        """
+        cls = _TYPES.get(data_type)
+        if cls is None and data_type:
+            module_name = "datatypes.{}_type".format(re.sub(r"(?<!^)(?=[A-Z][a-z])", "_", data_type).lower())
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                return None
+            cls = _TYPES.get(data_type)
+        return cls
+
+    def to_dict(self) -> dict:
+        # Generated for every datatype by RecordType.
+        return {"data_type": self.__class__.__name__}
 
     @classmethod
-    @abstractmethod
     def load(cls, data: dict) -> "BaseType":
-        pass
+        """Create an item from its record, ignoring unknown keys.
+
+        Args:
+            data: The record.
+
+        Returns:
+            The item.
+        """
+        return cls._from_dict(data)
+
+    def set_payload_path(self, payload_path: Any) -> None:
+        """Read the payload from a file or a packed payload from now on.
+
+        Args:
+            payload_path: The payload file path, or an object with ``read`` and ``size`` methods.
+        """
+        self._payload_path = payload_path
+        self._payload = None
+
+    def release_payload(self) -> None:
+        """Drop the payload from memory if it can be read back from its payload file or pack."""
+        if self.PAYLOAD_FIELD and self._payload_path:
+            self._payload = None
+
+    def payload_bytes(self) -> int:
+        """Get the size of the payload without reading it into memory.
+
+        Returns:
+            The length of the loaded payload, or the size of its payload file or packed payload, or 0.
+        """
+        if self._payload is not None:
+            return len(self._payload)
+        if self._payload_path:
+            try:
+                if isinstance(self._payload_path, str):
+                    return os.path.getsize(self._payload_path)
+                return self._payload_path.size()
+            except (OSError, KeyError):
+                return 0
+        return 0
+
+    def save_payload(self, file_path: str, content: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
@@ -0,0 +1,14 @@
+from typing import Any, Dict
+
+from datatypes.base_type import BaseType
+
+
+class Extracted(BaseType):
+    address: str = ""
+    site: str = ""
+    fields: Dict[str, Any] = {}
+
+    def __init__(self, address: str = "", site: str = "", fields: Dict[str, Any] = None):
+        self.address = address
+        self.site = site
+        self.fields = fields if fields is not None else {}
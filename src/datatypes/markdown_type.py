@@ -1,29 +1,13 @@
-import json
-
-from datatypes.base_type import BaseType
+from datatypes.base_type import BaseType, LazyPayload
 
 
 class Markdown(BaseType):
+    PAYLOAD_FIELD = "body"
+    PAYLOAD_EXTENSION = "md"
+
     address: str = ""
-    body: str = ""
+    body: str = LazyPayload()
 
     def __init__(self, address: str = "", body: str = ""):
         self.address = address
         self.body = body
-
-    def _save_all(self, file_path: str) -> None:
-        data = self.__dict__
-        with open(file_path, "w") as file:
-            json.dump(data, file, indent=4)
-
-    def save_payload(self, file_path: str, content: str) -> None:
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(content)
-
-    @classmethod
-    def load(cls, data: dict) -> "Markdown":
-        instance = cls()
-        for key, value in data.items():
-            if hasattr(instance, key):
-                setattr(instance, key, value)
-        return instance
@@ -1,31 +1,15 @@
-import json
-
-from datatypes.base_type import BaseType
+from datatypes.base_type import BaseType, LazyPayload
 
 
 class OpenAIChat(BaseType):
+    PAYLOAD_FIELD = "response"
+    PAYLOAD_EXTENSION = "txt"
+
     system_prompt: str = ""
     user_prompt: str = ""
-    response: str = ""
+    response: str = LazyPayload()
 
     def __init__(self, system_prompt: str = "", user_prompt: str = "", response: str = ""):
         self.system_prompt = system_prompt
         self.user_prompt = user_prompt
         self.response = response
-
-    def _save_all(self, file_path: str) -> None:
-        data = self.__dict__
-        with open(file_path, "w") as file:
-            json.dump(data, file, indent=4)
-
-    def save_payload(self, file_path: str, content: str) -> None:
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(content)
-
-    @classmethod
-    def load(cls, data: dict) -> "OpenAIChat":
-        instance = cls()
-        for key, value in data.items():
-            if hasattr(instance, key):
-                setattr(instance, key, value)
-        return instance
@@ -0,0 +1,43 @@
+import argparse
+import logging
+import os
+import sys
+
+from operators.logging_operator import LoggingOperator
+from operators.manifest_operator import ManifestOperator
+from operators.payload_pack_operator import PayloadPackOperator
+from operators.record_operator import RecordOperator
+
+
+def main():
+    LoggingOperator.setup_logging()
+
+    parser = argparse.ArgumentParser(description="Export packed payloads of node output folders to one file per item.")
+    parser.add_argument(
+        "paths", nargs="+", help="Output folders, or folders such as the data root that contain output folders"
+    )
+    args = parser.parse_args()
+
+    record_operator = RecordOperator()
+    manifest_operator = ManifestOperator()
+    pack_operator = PayloadPackOperator()
+    exported_folders = 0
+    for path in args.paths:
+        if not os.path.isdir(path):
+            logging.error(f"Not a folder: {path}")
+            sys.exit(1)
+        for folder_path, _, _ in os.walk(path):
+            if not pack_operator.exists(folder_path):
+                continue
+            record_operator.export_payloads(folder_path)
+            exported_folders += 1
+            # Checksums recorded for the pack no longer describe the folder.
+            manifest = manifest_operator.read(folder_path)
+            if manifest and "checksums" in manifest:
+                manifest["checksums"] = manifest_operator.checksums(folder_path)
+                manifest_operator.write(folder_path, manifest)
+    logging.info(f"Exported the payloads of {exported_folders} folders")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,32 @@
-import json
 import logging
-import os
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
 
 from datatypes.amazon_product_type import AmazonProduct
 from datatypes.page_type import Page
-from nodes.base_node import BaseNode
+from nodes.base_node import BaseNode, NodeContext
+from operators.html_parser_operator import HtmlParserOperator
+
+# Selectors are compiled once; every element they read lies in one of the subtrees with these ids.
+TARGET_IDS = ("productTitle", "altImages", "productDescription", "productFactsDesktopExpander")
+TITLE_SELECTOR = soupsieve.compile("#productTitle")
+IMAGE_SELECTOR = soupsieve.compile("#altImages img")
+DESCRIPTION_SELECTOR = soupsieve.compile("#productDescription")
+BULLET_SELECTOR = soupsieve.compile("div#productFactsDesktopExpander ul.a-unordered-list li")
 
 
 class AmazonProductParserNode(BaseNode):
     CACHE_DURATION = timedelta(hours=24)
+    EXECUTOR = "process"
+    PURE = True
+    VERSION = 2
+    # "partial" parses only the subtrees of TARGET_IDS, "full" parses the whole page through
+    # the shared parse cache. Overridable with the extraction kwarg.
+    EXTRACTION = "partial"
+    STRAINER = SoupStrainer(id=list(TARGET_IDS))
 
     def __init__(self, project_name: str):
         super().__init__(project_name)
@@ -21,39 +35,38 @@ class AmazonProductParserNode(BaseNode):
     def _load_data_item(self, file_path: str) -> AmazonProduct:
         return AmazonProduct.load(file_path)
 
-    def _process_item(self, item: Any) -> AmazonProduct:
+    def _process_item(self, item: Any, context: NodeContext) -> AmazonProduct:
         try:
             if isinstance(item, Page):
                 html_content = item.html
             else:
-                raise ValueError("Invalid input type. Expected AmazonProduct object.")
-
-            soup = BeautifulSoup(html_content, "html.parser")
-            item.asin = self._extract_asin(item.address)
-            item.title = self._extract_title(soup)
-            item.image_urls = self._extract_image_urls(soup)
-            item.description = self._extract_description(soup)
-            item.bullets = self._extract_bullets(soup)
-            self._logger.info(f"Successfully parsed Amazon product data for ASIN: {item.asin}")
+                raise ValueError("Invalid input type. Expected Page object.")
+
+            parser = context.get("html_parser")
+            extraction = context.get("extraction", self.EXTRACTION)
+            product = self._extract(item.address, self._parse(html_content, extraction, parser))
+            self._logger.info(f"Successfully parsed Amazon product data for ASIN: {product.asin}")
+            return product
         except Exception as e:
             self._logger.error(f"Failed to parse Amazon product data for URL: {item.address}. Error: {e}")
-        return item
-
-    def _save_data(self) -> None:
-        json_file_path = os.path.join(self._output_path, "all.json")
-        data = []
-        for index, item in enumerate(self._output_data):
-            entry = {
-                "asin": item.asin,
-                "address": item.address,
-                "title": item.title,
-                "image_urls": item.image_urls,
-                "description": item.description,
-                "bullets": item.bullets,
-            }
-            data.append(entry)
-        with open(json_file_path, "w") as json_file:
-            json.dump(data, json_file, indent=4)
+            return None
+
+    def _parse(self, html: str, extraction: str, parser: Optional[str]) -> BeautifulSoup:
+        if extraction == "partial":
+            return HtmlParserOperator.parse_only(html, self.STRAINER, parser)
+        if extraction == "full":
+            return HtmlParserOperator.shared().parse(html, parser)
+        raise ValueError(f"Unsupported extraction mode: {extraction}. Expected partial or full.")
+
+    def _extract(self, address: str, soup: BeautifulSoup) -> AmazonProduct:
+        product = AmazonProduct()
+        product.address = address
+        product.asin = self._extract_asin(address)
+        product.title = self._extract_title(soup)
+        product.image_urls = self._extract_image_urls(soup)
+        product.description = self._extract_description(soup)
+        product.bullets = self._extract_bullets(soup)
+        return product
 
     @staticmethod
     def _extract_asin(url: str) -> str:
@@ -62,12 +75,12 @@ class AmazonProductParserNode(BaseNode):
 
     @staticmethod
     def _extract_title(soup: BeautifulSoup) -> str:
-        title_element = soup.select_one("#productTitle")
+        title_element = TITLE_SELECTOR.select_one(soup)
         return title_element.get_text(strip=True) if title_element else ""
 
     @staticmethod
     def _extract_image_urls(soup: BeautifulSoup) -> list:
-        image_elements = soup.select("#altImages img")
+        image_elements = IMAGE_SELECTOR.select(soup)
         image_urls = [img["src"] for img in image_elements] if image_elements else []
 
         largest_image_urls = []
@@ -80,12 +93,12 @@ class AmazonProductParserNode(BaseNode):
 
     @staticmethod
     def _extract_description(soup: BeautifulSoup) -> str:
-        description_element = soup.select_one("#productDescription")
+        description_element = DESCRIPTION_SELECTOR.select_one(soup)
         return description_element.get_text(strip=True) if description_element else ""
 
     @staticmethod
     def _extract_bullets(soup: BeautifulSoup) -> list:
-        bullet_elements = soup.select("div#productFactsDesktopExpander ul.a-unordered-list li")
+        bullet_elements = BULLET_SELECTOR.select(soup)
         bullets = [bullet.get_text(strip=True) for bullet in bullet_elements] if bullet_elements else []
         return bullets
 
@@ -1,55 +1,227 @@
 import hashlib
-import importlib
 import json
 import logging
 import os
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Any, Optional, Type, TypeVar
+from functools import partial
+from typing import Deque, Dict, Iterable, Iterator, List, Any, Optional, Tuple, Type, TypeVar
+
+from datatypes.base_type import BaseType
+from operators.executor_operator import ExecutorOperator, ItemError
+from operators.html_parser_operator import HtmlParserOperator
+from operators.item_cache_operator import ItemCacheOperator
+from operators.manifest_operator import ManifestOperator
+from operators.memory_operator import MemoryOperator
+from operators.record_operator import RecordOperator
+from operators.stream_operator import StreamOperator
 
 T = TypeVar("T")
 
 
+class NodeStream:
+    """Lazily produced output of a node run, consumed by iterating over it.
+
+    Besides the items, a stream carries what downstream nodes need to key their caches:
+    the output folder of the run, whether it was served from a valid cache, and in that
+    case the content fingerprint recorded in the folder's manifest.
+    """
+
+    def __init__(self, items: Iterator[Any], output_path: str, cached: bool, fingerprint: Optional[str] = None):
+        self._items = items
+        self.output_path = output_path
+        self.cached = cached
+        self.fingerprint = fingerprint
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._items
+
+    def split(self, count: int, maxsize: int = 64) -> List["NodeStream"]:
+        """Split the stream into branches that all receive every item.
+
+        Args:
+            count: The number of branches.
+            maxsize: The maximum number of items buffered per branch.
+
+        Returns:
+            The branches, which must be consumed concurrently.
+        """
+        return [
+            NodeStream(branch, self.output_path, self.cached, self.fingerprint)
+            for branch in StreamOperator.tee(self._items, count, maxsize)
+        ]
+
+
+class NodeContext:
+    """State of a single get_path, get_data or iter_data call.
+
+    Everything that belongs to one run lives here instead of on the node, so a node
+    instance and the clients it owns can serve several runs at the same time.
+    """
+
+    def __init__(
+            self,
+            node_name: str,
+            kwargs: dict,
+            input_path: Optional[str] = None,
+            input_data: Optional[Iterable[Any]] = None,
+    ):
+        self.node_name = node_name
+        # All call arguments, including input_path, input_data and node_name.
+        self.kwargs = kwargs
+        self.input_path = input_path
+        self.input_data = input_data if input_data is not None else []
+        self.input_fingerprint = ""
+        self.output_path = ""
+        self.output_data: List[Any] = []
+        self.cache_valid = False
+        self.errors: List[ItemError] = []
+        self.item_cache: Optional[ItemCacheOperator] = None
+        self.item_cache_parameters: dict = {}
+        # Counters a node keeps about the run (cache hits, retries, ...), recorded in the manifest.
+        self.stats: Dict[str, int] = {}
+        # Measurements of single items (latency, throughput, ...) by item index, recorded in the manifest.
+        self.item_stats: Dict[int, Dict[str, Any]] = {}
+        # The position of the item being processed, set in the per-item views made by for_item.
+        self.item_index: Optional[int] = None
+        # Requests collected by a first pass over the input instead of being sent, and the answers
+        # sent for them, by cache key. None outside of such two-pass runs (see OpenAINode).
+        self.pending_requests: Optional[Dict[str, Any]] = None
+        self.prefetched_responses: Optional[Dict[str, str]] = None
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.kwargs.get(key, default)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a run counter. Counts made in process pool workers are not collected.
+
+        Args:
+            name: The counter name.
+            amount: The amount to add.
+        """
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def for_item(self, index: int) -> "NodeContext":
+        """Get the view of the context for processing one item.
+
+        The view shares all state with the run; it only knows which item it belongs to.
+
+        Args:
+            index: The position of the item in the input.
+
+        Returns:
+            The per-item context.
+        """
+        item_context = object.__new__(NodeContext)
+        item_context.__dict__.update(self.__dict__)
+        item_context.item_index = index
+        return item_context
+
+    def measure(self, name: str, value: Any) -> None:
+        """Record a measurement of the current item. Outside of a per-item view it is ignored.
+
+        Args:
+            name: The measurement name.
+            value: The measured value.
+        """
+        if self.item_index is None:
+            return
+        with self._stats_lock:
+            self.item_stats.setdefault(self.item_index, {})[name] = value
+
+    def __getstate__(self) -> dict:
+        # Process pool workers receive the context once; they never need the run's data.
+        state = self.__dict__.copy()
+        state["input_data"] = []
+        state["output_data"] = []
+        state["kwargs"] = {key: value for key, value in self.kwargs.items() if key != "input_data"}
+        del state["_stats_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+
+
 class BaseNode(ABC):
+    # Keyword arguments that only tune how a run executes (not what it produces) and
+    # are therefore left out of the output folder hash.
+    EXECUTION_KWARGS: tuple = (
+        "executor", "max_workers", "item_cache", "manifest_checksums", "buffer_size", "resume", "memory_budget_mb",
+        "pack_payloads",
+    )
+    # Keyword arguments that describe the input rather than how each item is processed.
+    INPUT_KWARGS: tuple = ("input_path", "input_data", "node_name")
+    # Default executor backend ("serial", "thread", "process" or "async") and worker count,
+    # overridable per get_path/get_data call with the executor and max_workers kwargs.
+    EXECUTOR = "serial"
+    MAX_WORKERS: Optional[int] = None
+    # Maximum number of items in flight between the input and the output of a run,
+    # overridable with the buffer_size kwarg.
+    BUFFER_SIZE = 64
+    # Whether results are reused per item across runs, overridable with the item_cache kwarg.
+    ITEM_CACHE = True
+    # Whether a run picks up the completed items of an interrupted run with the same input and
+    # parameters instead of starting over, overridable with the resume kwarg. Runs over a stream
+    # that is still being produced always start over, since its content is not known.
+    RESUME = True
+    # Resident memory budget of a run in megabytes, or None for no budget, overridable with the
+    # memory_budget_mb kwarg. Within a budget, fewer items are kept in flight, the payloads of
+    # processed items are dropped from memory once they are on disk and the high-water mark of
+    # the process is recorded in the manifest. Process pool workers are not measured.
+    MEMORY_BUDGET_MB: Optional[int] = None
+    # An item in flight takes roughly this many times the size of its payload (parsed trees,
+    # intermediate strings, the result), and the payloads of this many items are sampled.
+    MEMORY_ITEM_FACTOR = 10
+    MEMORY_SAMPLE_SIZE = 32
+    # Whether the payloads of a run are appended to one pack file in the output folder instead
+    # of one file per item, overridable with the pack_payloads kwarg. Packed folders are read
+    # the same way and can be exported to payload files with export_payloads.py.
+    PACK_PAYLOADS = False
+    # Pure nodes derive their output only from the input content and parameters, so their
+    # caches never expire: a changed input changes the input fingerprint and the cache key.
+    PURE = False
+    # Prefix of the input fingerprint of a stream that is still being produced, whose content is not known.
+    STREAM_FINGERPRINT_PREFIX = "stream:"
+    # Part of every cache key. Bump it when a change to the node alters its output for the
+    # same input and parameters, so that caches built by the old implementation are not reused.
+    VERSION = 1
+
     def __init__(self, project_name: str):
         self._project_name = project_name
         self._root_path = os.getenv("PROJECT_DATA_ROOT_PATH", "data")
         self._logger = logging.getLogger(__name__)
-        self._input_data: List[Any] = []
-        self._output_data: List[Any] = []
-        self._input_path: Optional[str] = None
-        self._output_path: str = ""
-        self._kwargs: dict = {}
-
-    def _load_data(self) -> None:
-        if self._input_path:
-            all_json_file = os.path.join(self._input_path, "all.json")
-            if os.path.exists(all_json_file):
-                with open(all_json_file, "r") as file:
-                    data = json.load(file)
-                    self._input_data = []
-                    for item in data:
-                        data_type = item.get("data_type", "")
-                        try:
-                            module_name = f"datatypes.{data_type.lower()}_type"
-                            class_name = data_type
-                            module = importlib.import_module(module_name)
-                            obj_class = getattr(module, class_name)
-                            obj = obj_class.load(item)
-                            self._input_data.append(obj)
-                        except (ImportError, AttributeError) as e:
-                            self._logger.warning(f"Failed to load object of type {data_type}. Error: {e}")
-            else:
-                self._logger.warning("all.json file not found in the input path.")
-        elif self._input_data:
-            self._input_data = [self._load_data_item(item) for item in self._input_data]
+        self._manifest_operator = ManifestOperator()
+        self._record_operator = RecordOperator()
 
-    @abstractmethod
-    def _process_item(self, item: Any) -> Any:
-        pass
+    def _load_data(self, input_path: str) -> List[Any]:
+        if not self._record_operator.exists(input_path):
+            self._logger.warning("No records found in the input path.")
+            return []
+        return list(self._iter_objects(input_path))
+
+    def _iter_objects(self, folder_path: str) -> Iterator[BaseType]:
+        # Payloads stay on disk until an item's payload field is accessed.
+        for record in self._record_operator.iter_records(folder_path):
+            obj = self._load_object(record)
+            if obj is not None:
+                self._record_operator.attach_payload(folder_path, record, obj)
+                yield obj
+
+    def _load_object(self, data: dict) -> Optional[BaseType]:
+        data_type = data.get("data_type", "")
+        obj_class = BaseType.type_for(data_type)
+        if obj_class is None:
+            self._logger.warning(f"Failed to load object of unknown type {data_type}")
+            return None
+        return obj_class.load(data)
 
     @abstractmethod
-    def _save_data(self) -> None:
+    def _process_item(self, item: Any, context: NodeContext) -> Any:
         pass
 
     @abstractmethod
@@ -60,75 +232,339 @@ class BaseNode(ABC):
     def _get_input_type(self) -> Type[T]:
         pass
 
-    def _get_output_folder(self, base_path: str, **kwargs: Any) -> str:
-        hash_input = json.dumps(kwargs, sort_keys=True).encode("utf-8")
-        hash_output = hashlib.md5(hash_input).hexdigest()
-        output_folder = os.path.join(base_path, hash_output)
+    def _get_max_workers(self, context: NodeContext) -> Optional[int]:
+        return context.get("max_workers", self.MAX_WORKERS)
 
-        if os.path.exists(output_folder) and self._is_cache_valid(output_folder):
-            self._logger.info(f"Using valid cache at {output_folder}")
-            self._is_cache_valid = True
-        else:
-            self._logger.info(f"Cache not found or invalid at {output_folder}")
-            self._is_cache_valid = False
+    def _iter_process(self, context: NodeContext) -> Iterator[Any]:
+        self._create_output_folder(context.output_path)
+        completed = self._recover(context)
+        if completed:
+            self._logger.info(f"Resuming the interrupted run at {context.output_path} after {len(completed)} items")
+        self._start_manifest(context)
+        self._open_item_cache(context)
+
+        # The indices of the items handed to the executor; their outcomes arrive in the same order.
+        submitted: Deque[int] = deque()
+
+        def remaining() -> Iterator[Tuple[int, Any]]:
+            for index, item in enumerate(context.input_data):
+                if index not in completed:
+                    submitted.append(index)
+                    yield index, item
+
+        buffer_size = context.get("buffer_size", self.BUFFER_SIZE)
+        budget = context.get("memory_budget_mb", self.MEMORY_BUDGET_MB)
+        memory = MemoryOperator(budget * 1024 * 1024) if budget else None
+        if memory is not None:
+            buffer_size = memory.window(self._estimate_item_bytes(context), buffer_size)
+            self._logger.info(f"Processing at most {buffer_size} items at a time within {budget} MB")
+
+        executor = ExecutorOperator(context.get("executor", self.EXECUTOR), self._get_max_workers(context))
+        outcomes = executor.imap(partial(self._process_entry, context=context), remaining(), buffer_size)
+
+        def merged() -> Iterator[Tuple[int, Any, Optional[Exception], bool]]:
+            # Interleave the items completed by the interrupted run with the new outcomes, in input order.
+            resumed = sorted(completed)
+            position = 0
+            for result, error in outcomes:
+                index = submitted.popleft()
+                while position < len(resumed) and resumed[position] < index:
+                    yield resumed[position], self._load_record(context, completed[resumed[position]]), None, True
+                    position += 1
+                yield index, result, error, False
+            for index in resumed[position:]:
+                yield index, self._load_record(context, completed[index]), None, True
+
+        fingerprint = hashlib.sha256()
+        input_count = 0
+        item_count = 0
+        pack = context.get("pack_payloads", self.PACK_PAYLOADS)
+        with self._record_operator.open_writer(context.output_path, append=bool(completed), pack=pack) as writer:
+            for index, result, error, resumed in merged():
+                input_count += 1
+                if error is not None:
+                    context.errors.append((index, error))
+                    self._logger.error(f"Failed to process item {index}. Error: {error}")
+                if result is not None:
+                    self._update_fingerprint(fingerprint, result)
+                    item_count += 1
+                    if not resumed:
+                        record = writer.append(index, result)
+                        if memory is not None:
+                            # From now on the payload is read back from its file or pack when it is accessed.
+                            self._record_operator.attach_payload(context.output_path, record, result)
+                    elif memory is not None:
+                        result.release_payload()
+                if memory is not None:
+                    memory.sample(HtmlParserOperator.shared().clear)
+                yield result
+        if completed:
+            self._record_operator.sort(context.output_path)
+            context.count("resumed_items", len(completed))
+        if memory is not None:
+            high_water = memory.high_water_bytes // (1024 * 1024)
+            context.count("memory_high_water_mb", high_water)
+            context.count("memory_window", buffer_size)
+            if memory.relief_count:
+                context.count("memory_reliefs", memory.relief_count)
+            self._logger.info(f"Memory high-water mark of {high_water} MB with a budget of {budget} MB")
+        self._complete_manifest(context, input_count, item_count, fingerprint.hexdigest())
+
+    def _open_item_cache(self, context: NodeContext) -> None:
+        """Set up the item cache of a run unless it is disabled or already set up.
+
+        Args:
+            context: The context of the current run.
+        """
+        if context.item_cache is not None or not context.get("item_cache", self.ITEM_CACHE):
+            return
+        context.item_cache = ItemCacheOperator(
+            os.path.join(self._root_path, self._project_name, "_items", f"{self.__class__.__name__}.sqlite"),
+            None if self.PURE else self._get_cache_duration(),
+        )
+        context.item_cache_parameters = {
+            key: value
+            for key, value in self._get_hash_kwargs(context.kwargs).items()
+            if key not in self.INPUT_KWARGS
+        }
+
+    def _recover(self, context: NodeContext) -> Dict[int, dict]:
+        """Get the records an interrupted run of the same input and parameters completed.
+
+        Args:
+            context: The context of the current run.
+
+        Returns:
+            The completed records by item index, empty if there is nothing to resume.
+        """
+        if not context.get("resume", self.RESUME):
+            return {}
+        if context.input_fingerprint.startswith(self.STREAM_FINGERPRINT_PREFIX):
+            # A live stream from the same upstream folder may carry different content than before,
+            # so records kept by index could belong to other input items.
+            return {}
+        manifest = self._manifest_operator.read(context.output_path)
+        if not manifest or manifest.get("status") != ManifestOperator.RUNNING:
+            return {}
+        if manifest.get("input_fingerprint") != context.input_fingerprint:
+            return {}
+        return self._record_operator.recover(context.output_path)
+
+    def _load_record(self, context: NodeContext, record: dict) -> Optional[BaseType]:
+        obj = self._load_object(record)
+        if obj is not None:
+            self._record_operator.attach_payload(context.output_path, record, obj)
+        return obj
+
+    def _process_entry(self, entry: Tuple[int, Any], context: NodeContext) -> Any:
+        index, item = entry
+        result = self._process_item_cached(item, context.for_item(index))
+        if result is not item and isinstance(item, BaseType) and context.get("memory_budget_mb", self.MEMORY_BUDGET_MB):
+            item.release_payload()
+        return result
+
+    def _estimate_item_bytes(self, context: NodeContext) -> int:
+        """Estimate the memory an item takes while it is processed, from the first input items.
 
-        return output_folder
+        Args:
+            context: The context of the current run.
+
+        Returns:
+            The estimated bytes per item, 0 if the input is a stream that cannot be sampled.
+        """
+        if not isinstance(context.input_data, list) or not context.input_data:
+            return 0
+        sample = context.input_data[:self.MEMORY_SAMPLE_SIZE]
+        return sum(self._get_item_bytes(item) for item in sample) // len(sample) * self.MEMORY_ITEM_FACTOR
+
+    def _get_item_bytes(self, item: Any) -> int:
+        if isinstance(item, BaseType) and item.PAYLOAD_FIELD:
+            return item.payload_bytes()
+        return len(json.dumps(self._item_to_dict(item), default=str))
+
+    def _process_item_cached(self, item: Any, context: NodeContext) -> Any:
+        item_cache = context.item_cache
+        if item_cache is None:
+            return self._process_item(item, context)
+
+        key = item_cache.key(
+            f"{self.__class__.__name__}:{self.VERSION}", context.item_cache_parameters, self._item_to_dict(item)
+        )
+        record = item_cache.get(key)
+        if record is not None:
+            cached = self._load_object(record)
+            if cached is not None:
+                self._logger.debug(f"Reusing cached result for item {key}")
+                return cached
+
+        result = self._process_item(item, context)
+        if isinstance(result, BaseType):
+            item_cache.put(key, result.to_dict(), result.PAYLOAD_FIELD)
+        return result
+
+    @staticmethod
+    def _item_to_dict(item: Any) -> Any:
+        return item.to_dict() if isinstance(item, BaseType) else item
+
+    def _fingerprint(self, items: Iterable[Any]) -> str:
+        digest = hashlib.sha256()
+        for item in items:
+            if item is not None:
+                self._update_fingerprint(digest, item)
+                if isinstance(item, BaseType):
+                    # Hashing reads lazily loaded payloads; they are read again when the item is processed.
+                    item.release_payload()
+        return digest.hexdigest()
+
+    def _update_fingerprint(self, digest: "hashlib._Hash", item: Any) -> None:
+        digest.update(json.dumps(self._item_to_dict(item), sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\n")
+
+    def _get_input_fingerprint(self, context: NodeContext) -> str:
+        # Reuse the fingerprint the upstream node recorded for its output, if any.
+        if context.input_path:
+            manifest = self._manifest_operator.read(context.input_path)
+            if manifest and manifest.get("status") == ManifestOperator.COMPLETE and manifest.get("fingerprint"):
+                return manifest["fingerprint"]
+        return self._fingerprint(context.input_data)
+
+    def _get_hash_kwargs(self, kwargs: dict) -> dict:
+        return {key: value for key, value in kwargs.items() if key not in self.EXECUTION_KWARGS}
+
+    def _get_output_folder(self, base_path: str, context: NodeContext) -> str:
+        # The input is identified by its content, not by where it was read from.
+        hash_kwargs = self._get_hash_kwargs(context.kwargs)
+        hash_kwargs.pop("input_path", None)
+        hash_kwargs.pop("input_data", None)
+        hash_kwargs["input_fingerprint"] = context.input_fingerprint
+        hash_kwargs["node_version"] = self.VERSION
+        hash_input = json.dumps(hash_kwargs, sort_keys=True).encode("utf-8")
+        hash_output = hashlib.md5(hash_input).hexdigest()
+        return os.path.join(base_path, hash_output)
 
     def _create_output_folder(self, output_folder: str) -> None:
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
         self._logger.info(f"Creating new output folder at {output_folder}")
 
-    def _is_cache_valid(self, folder_path: str) -> bool:
-        file_paths = [os.path.join(root, file) for root, _, files in os.walk(folder_path) for file in files]
-        if file_paths:
-            latest_mod_time = max(os.path.getmtime(file_path) for file_path in file_paths)
-            return datetime.now() - datetime.fromtimestamp(latest_mod_time) <= self._get_cache_duration()
-        return False
+    def _is_cache_valid(self, folder_path: str, input_fingerprint: str) -> bool:
+        if not os.path.exists(folder_path):
+            return False
+        manifest = self._manifest_operator.read(folder_path)
+        if not manifest or manifest.get("status") != ManifestOperator.COMPLETE:
+            return False
+        if self.PURE:
+            return manifest.get("input_fingerprint") == input_fingerprint
+        completed_at = datetime.fromisoformat(manifest["completed_at"])
+        return datetime.now() - completed_at <= self._get_cache_duration()
 
-    def _execute(
+    def _start_manifest(self, context: NodeContext) -> None:
+        self._manifest_operator.write(
+            context.output_path,
+            {
+                "status": ManifestOperator.RUNNING,
+                "node": self.__class__.__name__,
+                "started_at": datetime.now().isoformat(),
+                "input_fingerprint": context.input_fingerprint,
+            },
+        )
+
+    def _complete_manifest(self, context: NodeContext, input_count: int, item_count: int, fingerprint: str) -> None:
+        parameters = self._get_hash_kwargs(context.kwargs)
+        parameters.pop("input_data", None)
+        manifest = {
+            "status": ManifestOperator.COMPLETE,
+            "node": self.__class__.__name__,
+            "completed_at": datetime.now().isoformat(),
+            "input_count": input_count,
+            "item_count": item_count,
+            "error_count": len(context.errors),
+            "parameters": parameters,
+            "input_fingerprint": context.input_fingerprint,
+            "fingerprint": fingerprint,
+        }
+        if context.stats:
+            manifest["stats"] = dict(context.stats)
+            self._logger.info(f"Run statistics for {context.output_path}: {manifest['stats']}")
+        if context.item_stats:
+            manifest["item_stats"] = {str(index): context.item_stats[index] for index in sorted(context.item_stats)}
+        if context.get("manifest_checksums", False):
+            manifest["checksums"] = self._manifest_operator.checksums(context.output_path)
+        self._manifest_operator.write(context.output_path, manifest)
+
+    def _prepare(
             self,
             input_path: Optional[str] = None,
-            input_data: Optional[List[Any]] = None,
+            input_data: Optional[Iterable[Any]] = None,
             node_name: Optional[str] = None,
             **kwargs: Any,
-    ) -> None:
+    ) -> Optional[NodeContext]:
+        stream = input_data if isinstance(input_data, NodeStream) else None
+
+        # Use the provided node_name or default to the class name
+        if node_name is None:
+            node_name = self.__class__.__name__
+
+        # Merge input_path and input_data with kwargs (exclude node_name)
+        context = NodeContext(
+            node_name,
+            {"input_path": input_path, "input_data": input_data, "node_name": node_name, **kwargs},
+            input_path=input_path,
+        )
         if input_path is not None:
-            self._input_path = input_path
-            self._load_data()
+            context.input_data = self._load_data(input_path)
+        elif stream is not None:
+            context.input_data = stream
         elif input_data is not None:
-            self._input_data = input_data
+            context.input_data = list(input_data)
         else:
             self._logger.error("No input path or input data provided.")
-            return
+            return None
 
-        if not self._input_data:
+        if stream is None and not context.input_data:
             self._logger.error("No input data loaded.")
-            return
-
-        # Use the provided node_name or default to the class name
-        if node_name is None:
-            node_name = self.__class__.__name__
+            return None
 
         # Create the base path using the provided node_name
         base_path = os.path.join(self._root_path, self._project_name, node_name)
         if not os.path.exists(base_path):
             os.makedirs(base_path)
 
-        # Merge input_path and input_data with kwargs (exclude node_name)
-        self._kwargs = {
-            "input_path": input_path,
-            "input_data": input_data,
-            "node_name": node_name,
-            **kwargs,
-        }
+        if stream is None:
+            context.input_fingerprint = self._get_input_fingerprint(context)
+        elif stream.cached:
+            context.input_fingerprint = stream.fingerprint
+        else:
+            # The content of a stream that is still being produced is not known yet.
+            context.input_fingerprint = f"{self.STREAM_FINGERPRINT_PREFIX}{stream.output_path}"
+        context.output_path = self._get_output_folder(base_path, context)
 
-        self._output_path = self._get_output_folder(base_path, **self._kwargs)
+        if (stream is None or stream.cached) and self._is_cache_valid(context.output_path, context.input_fingerprint):
+            self._logger.info(f"Using valid cache at {context.output_path}")
+            context.cache_valid = True
+        else:
+            self._logger.info(f"Cache not found or invalid at {context.output_path}")
+        return context
 
-        if not self._is_cache_valid:
-            self._create_output_folder(self._output_path)
-            self._output_data = [self._process_item(item) for item in self._input_data]
-            self._save_data()
+    def _execute(
+            self,
+            input_path: Optional[str] = None,
+            input_data: Optional[List[Any]] = None,
+            node_name: Optional[str] = None,
+            **kwargs: Any,
+    ) -> Optional[NodeContext]:
+        context = self._prepare(input_path, input_data, node_name, **kwargs)
+        if context is None:
+            return None
+
+        if not context.cache_valid:
+            context.output_data = list(self._iter_process(context))
+        else:
+            context.output_data = list(self._iter_objects(context.output_path))
+        return context
+
+    def close(self) -> None:
+        pass
 
     def get_path(
             self,
@@ -137,8 +573,8 @@ class BaseNode(ABC):
             node_name: Optional[str] = None,
             **kwargs: Any,
     ) -> str:
-        self._execute(input_path, input_data, node_name, **kwargs)
-        return self._output_path
+        context = self._execute(input_path, input_data, node_name, **kwargs)
+        return context.output_path if context is not None else ""
 
     def get_data(
             self,
@@ -147,5 +583,27 @@ class BaseNode(ABC):
             node_name: Optional[str] = None,
             **kwargs: Any,
     ) -> List[Any]:
-        self._execute(input_path, input_data, node_name, **kwargs)
-        return self._output_data
+        context = self._execute(input_path, input_data, node_name, **kwargs)
+        return context.output_data if context is not None else []
+
+    def iter_data(
+            self,
+            input_path: Optional[str] = None,
+            input_data: Optional[Iterable[Any]] = None,
+            node_name: Optional[str] = None,
+            **kwargs: Any,
+    ) -> NodeStream:
+        context = self._prepare(input_path, input_data, node_name, **kwargs)
+        if context is None:
+            return NodeStream(iter(()), "", False)
+
+        if context.cache_valid:
+            manifest = self._manifest_operator.read(context.output_path)
+            return NodeStream(
+                self._iter_objects(context.output_path), context.output_path, True, manifest["fingerprint"]
+            )
+
+        # Process in a background thread that runs at most buffer_size items ahead of the consumer.
+        items = (item for item in self._iter_process(context) if item is not None)
+        buffer_size = context.get("buffer_size", self.BUFFER_SIZE)
+        return NodeStream(StreamOperator.buffered(items, buffer_size), context.output_path, False)
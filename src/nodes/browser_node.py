@@ -1,18 +1,17 @@
-import json
 import logging
-import os
-import time
+import threading
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
 
-import requests
-import undetected_chromedriver as uc
 from dotenv import load_dotenv
 
 from datatypes.page_type import Page
 from datatypes.url_type import Url
-from nodes.base_node import BaseNode
+from nodes.base_node import BaseNode, NodeContext
+from operators.chrome_driver_operator import ChromeDriverOperator
 from operators.file_operator import FileOperator
+from operators.http_operator import HttpOperator
 
 load_dotenv()
 
@@ -21,16 +20,42 @@ class BrowserNode(BaseNode):
     """Node for fetching HTML content from URLs using requests or Selenium."""
 
     CACHE_DURATION = timedelta(hours=24)
-
-    def __init__(self, project_name: str):
+    EXECUTION_KWARGS = BaseNode.EXECUTION_KWARGS + ("max_per_host",)
+    EXECUTOR = "thread"
+    MAX_WORKERS = 16
+    DEFAULT_MAX_PER_HOST = 4
+
+    def __init__(
+            self,
+            project_name: str,
+            driver_pool_size: int = 4,
+            driver_max_pages: int = 50,
+            http_pool_size: int = MAX_WORKERS,
+            http_timeout: Tuple[float, float] = (10.0, 30.0),
+            http2: bool = False,
+    ):
         """Initialize the BrowserNode.
 
         Args:
             project_name: The name of the project.
+            driver_pool_size: The number of Chrome instances kept alive for JavaScript rendering.
+            driver_max_pages: The number of pages a Chrome instance renders before it is recycled.
+            http_pool_size: The number of keep-alive connections per host for plain fetches.
+            http_timeout: The (connect, read) timeout in seconds for plain fetches.
+            http2: Whether plain fetches negotiate HTTP/2 when available.
         """
         super().__init__(project_name)
         self._logger = logging.getLogger(__name__)
         self.file_operator = FileOperator()
+        self._driver_pool_size = driver_pool_size
+        self._driver_max_pages = driver_max_pages
+        self._driver_pool: Optional[ChromeDriverOperator] = None
+        self._driver_pool_lock = threading.Lock()
+        self._http_options = {"pool_size": http_pool_size, "timeout": http_timeout, "http2": http2}
+        self._http: Optional[HttpOperator] = None
+        self._http_lock = threading.Lock()
+        self._host_semaphores: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
 
     def _load_data_item(self, file_path: str) -> Page:
         """Load a single data item from a file.
@@ -43,35 +68,70 @@ class BrowserNode(BaseNode):
         """
         return Page.load(file_path)
 
-    def _process_item(self, item: Any) -> Any:
+    def _get_max_workers(self, context: NodeContext) -> Optional[int]:
+        """Get the number of concurrent fetches, capped by the driver pool when rendering JavaScript.
+
+        Args:
+            context: The context of the current run.
+
+        Returns:
+            The maximum number of items fetched at the same time.
+        """
+        max_workers = super()._get_max_workers(context)
+        if context.get("execute_js", False):
+            # Without a worker count the executor would pick its own default, which can exceed the pool.
+            max_workers = self._driver_pool_size if max_workers is None else min(max_workers, self._driver_pool_size)
+        return max_workers
+
+    def _get_host_semaphore(self, url: str, max_per_host: int) -> threading.BoundedSemaphore:
+        """Get the semaphore limiting concurrent fetches to the host of the given URL.
+
+        Args:
+            url: The URL about to be fetched.
+            max_per_host: The maximum number of concurrent fetches per host.
+
+        Returns:
+            The semaphore shared by all URLs of the same host.
+        """
+        max_per_host = max(1, max_per_host)
+        key = (urlparse(url).netloc.lower(), max_per_host)
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(max_per_host)
+                self._host_semaphores[key] = semaphore
+            return semaphore
+
+    def _process_item(self, item: Any, context: NodeContext) -> Any:
         """Process a single item by fetching its HTML content.
 
         Args:
             item: The item to process (Page object or Url object).
+            context: The context of the current run.
 
         Returns:
             The processed Page object with the fetched HTML content.
         """
         if isinstance(item, Page):
-            return self._process_page(item)
+            return self._process_page(item, context)
         elif isinstance(item, Url):
-            return self._process_url(item)
+            return self._process_url(item, context)
         else:
             raise ValueError(f"Unsupported item type: {type(item)}")
 
-    def _process_url(self, url: Url) -> Page:
+    def _process_url(self, url: Url, context: NodeContext) -> Page:
         """Process a Url object by fetching its HTML content.
 
         Args:
             url: The Url object to process.
+            context: The context of the current run.
 
         Returns:
             The processed Page object with the fetched HTML content.
         """
-        execute_js = self._kwargs.get("execute_js", False)
         try:
             page = Page(address=url.address)
-            html_content = self._fetch_html(url.address, execute_js)
+            html_content = self._fetch_html(url.address, context)
             page.html = html_content
             self._logger.info(f"Successfully fetched HTML content from URL: {url.address}")
             return page
@@ -79,18 +139,18 @@ class BrowserNode(BaseNode):
             self._logger.error(f"Failed to fetch HTML content from URL: {url.address}. Error: {e}")
             return None
 
-    def _process_page(self, page: Page) -> Page:
+    def _process_page(self, page: Page, context: NodeContext) -> Page:
         """Process a Page object by fetching its HTML content.
 
         Args:
             page: The Page object to process.
+            context: The context of the current run.
 
         Returns:
             The processed Page object with the fetched HTML content.
         """
-        execute_js = self._kwargs.get("execute_js", False)
         try:
-            html_content = self._fetch_html(page.address, execute_js)
+            html_content = self._fetch_html(page.address, context)
             page.html = html_content
             self._logger.info(f"Successfully fetched HTML content from URL: {page.address}")
             return page
@@ -98,42 +158,24 @@ class BrowserNode(BaseNode):
             self._logger.error(f"Failed to fetch HTML content from URL: {page.address}. Error: {e}")
             return None
 
-    def _fetch_html(self, url: str, execute_js: bool) -> str:
+    def _fetch_html(self, url: str, context: NodeContext) -> str:
         """Fetch the HTML content from the given URL.
 
         Args:
             url: The URL to fetch the HTML content from.
-            execute_js: Whether to execute JavaScript when fetching the HTML content.
+            context: The context of the current run, which tells whether to execute JavaScript.
 
         Returns:
             The fetched HTML content.
         """
-        if execute_js:
-            return self._use_selenium(url)
-        else:
-            return self._use_requests(url)
-
-    def _save_data(self) -> None:
-        """Save the processed data to files."""
-        json_file_path = os.path.join(self._output_path, "all.json")
-        data = []
-        for index, item in enumerate(self._output_data):
-            file_name = f"payload_{index}.html"
-            file_path = os.path.join(self._output_path, file_name)
-            item.save_payload(file_path, item.html)
-            entry = {
-                "data_type": item.__class__.__name__,
-                "address": item.address,
-                "html": item.html,
-                "file_name": file_name,
-            }
-            data.append(entry)
-        with open(json_file_path, "w") as json_file:
-            json.dump(data, json_file, indent=4)
-
-    @staticmethod
-    def _use_requests(url: str) -> str:
-        """Fetch the HTML content from the given URL using the requests library.
+        with self._get_host_semaphore(url, context.get("max_per_host", self.DEFAULT_MAX_PER_HOST)):
+            if context.get("execute_js", False):
+                return self._use_selenium(url)
+            else:
+                return self._use_requests(url)
+
+    def _use_requests(self, url: str) -> str:
+        """Fetch the HTML content from the given URL using the node's pooled HTTP client.
 
         Args:
             url: The URL to fetch the HTML content from.
@@ -141,13 +183,21 @@ class BrowserNode(BaseNode):
         Returns:
             The fetched HTML content.
         """
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
+        return self._get_http().get_text(url)
+
+    def _get_http(self) -> HttpOperator:
+        """Get the pooled HTTP client, creating it on first use.
+
+        Returns:
+            The HTTP client owned by this node.
+        """
+        with self._http_lock:
+            if self._http is None:
+                self._http = HttpOperator(**self._http_options)
+            return self._http
 
-    @staticmethod
-    def _use_selenium(url: str) -> str:
-        """Fetch the HTML content from the given URL using Selenium with undetected_chromedriver.
+    def _use_selenium(self, url: str) -> str:
+        """Fetch the HTML content from the given URL using a pooled undetected_chromedriver instance.
 
         Args:
             url: The URL to fetch the HTML content from.
@@ -155,19 +205,33 @@ class BrowserNode(BaseNode):
         Returns:
             The fetched HTML content.
         """
-        browser_executable_path = os.getenv("CHROME_EXECUTABLE_PATH")
-        user_data_dir = os.getenv("USER_DATA_ROOT_PATH")
-        driver = uc.Chrome(
-            browser_executable_path=browser_executable_path, user_data_dir=user_data_dir, use_subprocess=True
-        )
-        try:
-            driver.get("about:blank")
-            time.sleep(1)
+        with self._get_driver_pool().lease() as driver:
             driver.get(url)
-            html_content = driver.page_source
-        finally:
-            driver.quit()
-        return html_content
+            return driver.page_source
+
+    def _get_driver_pool(self) -> ChromeDriverOperator:
+        """Get the Chrome driver pool, creating it on first use.
+
+        Returns:
+            The driver pool owned by this node.
+        """
+        with self._driver_pool_lock:
+            if self._driver_pool is None:
+                self._driver_pool = ChromeDriverOperator(
+                    size=self._driver_pool_size, max_pages=self._driver_max_pages
+                )
+            return self._driver_pool
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections and quit the pooled Chrome instances."""
+        with self._http_lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+        with self._driver_pool_lock:
+            if self._driver_pool is not None:
+                self._driver_pool.close()
+                self._driver_pool = None
 
     def _get_cache_duration(self) -> timedelta:
         """Get the cache duration for the node.
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import SoupStrainer
+
+from datatypes.extracted_type import Extracted
+from datatypes.page_type import Page
+from nodes.base_node import BaseNode, NodeContext
+from operators.extraction_operator import ExtractionOperator
+from operators.html_parser_operator import HtmlParserOperator
+
+# A compiled site: its domains, the strainer of its partial parse (if any) and its extractor.
+Site = Tuple[Tuple[str, ...], Optional[SoupStrainer], ExtractionOperator]
+
+
+@lru_cache(maxsize=8)
+def _load_sites(rules_path: str, modified_at: float) -> Dict[str, Site]:
+    # Keyed on the modification time, so edited rules are recompiled without a restart.
+    with open(rules_path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+    sites = {}
+    for name, site in config.items():
+        ids = site.get("parse_only_ids")
+        strainer = SoupStrainer(id=list(ids)) if ids else None
+        sites[name] = (tuple(site.get("domains", ())), strainer, ExtractionOperator(site["fields"]))
+    return sites
+
+
+class ExtractionNode(BaseNode):
+    """Node for extracting fields from pages with declarative per-site rules.
+
+    The rules live in a JSON file (RULES_PATH by default, overridable with the rules_path
+    kwarg) that maps a site name to its domains and field rules, so supporting a new
+    retailer only takes a new entry. The site of a page is found from its domain unless
+    the site kwarg names it. A site may list the ids of the subtrees its rules read in
+    parse_only_ids, in which case only those subtrees are parsed.
+    """
+
+    CACHE_DURATION = timedelta(hours=24)
+    EXECUTOR = "process"
+    PURE = True
+    RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_rules.json")
+
+    def __init__(self, project_name: str):
+        super().__init__(project_name)
+        self._logger = logging.getLogger(__name__)
+
+    def _process_item(self, item: Any, context: NodeContext) -> Optional[Extracted]:
+        """Extract the fields of a page with the rules of its site.
+
+        Args:
+            item: The Page object to process.
+            context: The context of the current run.
+
+        Returns:
+            The extracted fields, or None if the page could not be processed.
+        """
+        try:
+            if not isinstance(item, Page):
+                raise ValueError("Invalid input type. Expected Page object.")
+
+            sites = self._get_sites(context)
+            site = context.get("site") or self._match_site(item.address, sites)
+            if site not in sites:
+                raise ValueError(f"No extraction rules for site: {site}")
+            _, strainer, extractor = sites[site]
+
+            parser = context.get("html_parser")
+            if strainer is not None:
+                soup = HtmlParserOperator.parse_only(item.html, strainer, parser)
+            else:
+                soup = HtmlParserOperator.shared().parse(item.html, parser)
+            fields = extractor.extract(soup, item.address)
+            self._logger.info(f"Successfully extracted {len(fields)} fields for URL: {item.address}")
+            return Extracted(address=item.address, site=site, fields=fields)
+        except Exception as e:
+            self._logger.error(f"Failed to extract fields for URL: {item.address}. Error: {e}")
+            return None
+
+    def _get_sites(self, context: NodeContext) -> Dict[str, Site]:
+        """Get the compiled rules of every site.
+
+        Args:
+            context: The context of the current run.
+
+        Returns:
+            The compiled sites by name.
+        """
+        rules_path = self._get_rules_path(context.kwargs)
+        return _load_sites(rules_path, os.path.getmtime(rules_path))
+
+    def _get_rules_path(self, kwargs: dict) -> str:
+        return kwargs.get("rules_path") or self.RULES_PATH
+
+    def _get_hash_kwargs(self, kwargs: dict) -> dict:
+        """Add the content of the rules file to the parameters the caches are keyed on.
+
+        Args:
+            kwargs: The call arguments.
+
+        Returns:
+            The parameters that determine the output.
+        """
+        hash_kwargs = super()._get_hash_kwargs(kwargs)
+        with open(self._get_rules_path(kwargs), "rb") as file:
+            hash_kwargs["rules_fingerprint"] = hashlib.sha256(file.read()).hexdigest()
+        return hash_kwargs
+
+    @staticmethod
+    def _match_site(address: str, sites: Dict[str, Site]) -> Optional[str]:
+        """Find the site whose domains include the host of an address.
+
+        Args:
+            address: The page address.
+            sites: The compiled sites by name.
+
+        Returns:
+            The site name, or None if no site matches.
+        """
+        host = urlparse(address).netloc.lower().split(":")[0]
+        for name, (domains, _, _) in sites.items():
+            if any(host == domain or host.endswith("." + domain) for domain in domains):
+                return name
+        return None
+
+    def _get_cache_duration(self) -> timedelta:
+        return self.CACHE_DURATION
+
+    def _get_input_type(self) -> Any:
+        return Page
@@ -1,19 +1,24 @@
-import json
 import logging
-import os
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 
-from bs4 import BeautifulSoup
-from markdownify import markdownify
+from markdownify import MarkdownConverter
 
 from datatypes.markdown_type import Markdown
 from datatypes.page_type import Page
-from nodes.base_node import BaseNode
+from nodes.base_node import BaseNode, NodeContext
+from operators.html_parser_operator import HtmlParserOperator
+from operators.markdown_operator import MarkdownOperator
 
 
 class MarkdownNode(BaseNode):
     CACHE_DURATION = timedelta(hours=24)
+    EXECUTOR = "process"
+    PURE = True
+    VERSION = 2
+    # "builtin" for the single-pass MarkdownOperator or "markdownify", overridable with the
+    # markdown_converter kwarg. Boilerplate stripping (strip_boilerplate kwarg) needs "builtin".
+    CONVERTER = "builtin"
 
     def __init__(self, project_name: str):
         super().__init__(project_name)
@@ -22,7 +27,7 @@ class MarkdownNode(BaseNode):
     def _load_data_item(self, file_path: str) -> Page:
         return Page.load(file_path)
 
-    def _process_item(self, item: Any) -> Markdown:
+    def _process_item(self, item: Any, context: NodeContext) -> Markdown:
         try:
             if isinstance(item, Page):
                 html_content = item.html
@@ -30,7 +35,12 @@ class MarkdownNode(BaseNode):
             else:
                 raise ValueError("Invalid input type. Expected Page object.")
 
-            markdown_content = self._convert_html_to_markdown(html_content)
+            markdown_content = self._convert_html_to_markdown(
+                html_content,
+                context.get("html_parser"),
+                context.get("markdown_converter", self.CONVERTER),
+                context.get("strip_boilerplate", False),
+            )
             markdown_item = Markdown(address=address, body=markdown_content)
             self._logger.info(f"Successfully converted HTML to Markdown for URL: {address}")
             return markdown_item
@@ -38,34 +48,19 @@ class MarkdownNode(BaseNode):
             self._logger.error(f"Failed to convert HTML to Markdown for URL: {item.address}. Error: {e}")
             return None
 
-    def _save_data(self) -> None:
-        json_file_path = os.path.join(self._output_path, "all.json")
-        data = []
-        for index, item in enumerate(self._output_data):
-            if item is not None:
-                file_name = f"payload_{index}.md"
-                file_path = os.path.join(self._output_path, file_name)
-                item.save_payload(file_path, item.body)
-                entry = {
-                    "data_type": item.__class__.__name__,
-                    "address": item.address,
-                    "body": item.body,
-                    "file_name": file_name,
-                }
-                data.append(entry)
-        with open(json_file_path, "w") as json_file:
-            json.dump(data, json_file, indent=4)
-
     @staticmethod
-    def _convert_html_to_markdown(html: str) -> str:
-        soup = BeautifulSoup(html, "html.parser")
+    def _convert_html_to_markdown(
+            html: str, parser: Optional[str] = None, converter: str = CONVERTER, strip_boilerplate: bool = False
+    ) -> str:
+        soup = HtmlParserOperator.shared().parse(html, parser)
+        if converter == "builtin":
+            return MarkdownOperator(strip_boilerplate).convert(soup)
+        if converter != "markdownify":
+            raise ValueError(f"Unsupported markdown converter: {converter}. Expected builtin or markdownify.")
+        # Convert the shared tree directly instead of serializing it for markdownify to parse again.
         body = soup.body
-        if body:
-            html_content = str(body)
-        else:
-            html_content = str(soup)
-        markdown_content = markdownify(html_content)
-        return markdown_content
+        # The converter only strips the separation newlines when it is given a whole document.
+        return MarkdownConverter().convert_soup(body if body else soup).strip("\n")
 
     def _get_cache_duration(self) -> timedelta:
         return self.CACHE_DURATION
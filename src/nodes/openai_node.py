@@ -1,9 +1,11 @@
 import json
 import logging
 import os
+import time
 from datetime import timedelta
-from typing import Any, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+import openai
 from dotenv import load_dotenv
 from openai import OpenAI
 
@@ -12,18 +14,79 @@ from datatypes.markdown_type import Markdown
 from datatypes.openai_chat_type import OpenAIChat
 from datatypes.page_type import Page
 from datatypes.url_type import Url
-from nodes.base_node import BaseNode
+from nodes.base_node import BaseNode, NodeContext
+from operators.executor_operator import ExecutorOperator
+from operators.llm_cache_operator import LlmCacheOperator
+from operators.openai_batch_operator import OpenAIBatchOperator
+from operators.rate_limit_operator import RateLimitOperator
+from operators.token_operator import TokenOperator
 
 load_dotenv()
 
+# A prompt waiting to be sent: its request, its instruction and its content.
+PendingPrompt = Tuple[dict, str, str]
+
 
 class OpenAINode(BaseNode):
     CACHE_DURATION = timedelta(hours=24)
-
-    def __init__(self, project_name: str):
+    EXECUTOR = "thread"
+    MAX_WORKERS = 16
+    MAX_RETRIES = 5
+    EXECUTION_KWARGS = BaseNode.EXECUTION_KWARGS + (
+        "response_cache", "batch", "batch_poll_interval", "batch_timeout", "pack", "pack_max_items", "pack_max_tokens",
+        "stream",
+    )
+    DEFAULT_MODEL = "gpt-3.5-turbo"
+    DEFAULT_MAX_TOKENS = 100
+    # Whether responses are reused from the persistent response cache shared by all projects,
+    # overridable with the response_cache kwarg.
+    RESPONSE_CACHE = True
+    RESPONSE_CACHE_DURATION = timedelta(days=30)
+    # Whether completions are streamed into the payload file of their item as they are generated,
+    # overridable with the stream kwarg.
+    STREAM = False
+    # Whether runs submit their prompts through the Batch API instead of one call per item,
+    # overridable with the batch kwarg, and how the batches are polled: the batch_poll_interval
+    # and batch_timeout kwargs take seconds or a timedelta. Batches still running at the timeout
+    # are cancelled; the prompts they did not answer are sent synchronously.
+    BATCH = False
+    BATCH_POLL_INTERVAL = 60
+    BATCH_TIMEOUT = timedelta(hours=24)
+    # Whether small prompts that share their instruction are answered together, at most this
+    # many and this many content tokens per request, overridable with the pack, pack_max_items
+    # and pack_max_tokens kwargs. A packed request also stays within the context window and the
+    # output limit of the model, given the max_tokens of every answer.
+    PACK = False
+    PACK_MAX_ITEMS = 20
+    PACK_MAX_TOKENS = 4000
+    # Completion tokens a packed request needs per item besides the answers, for the JSON syntax,
+    # and prompt tokens per item besides the content, for its heading.
+    PACK_TOKENS_PER_ITEM = 16
+    PACK_PROMPT_TOKENS_PER_ITEM = 8
+    PACK_PROMPT = (
+        "{instruction}\n\n"
+        "Below are {count} separate items. Follow the instruction for each item on its own, as if it were "
+        "the only one. Reply with a JSON object that maps the number of every item to its answer as a string, "
+        'for example {{"1": "...", "2": "..."}}.\n\n'
+        "{items}"
+    )
+    # Content too long for one request is answered part by part, then the answers are combined.
+    PART_NOTE = (
+        "This is part {part} of {parts} of the content. Answer for this part only; "
+        "the answers to all parts will be combined afterwards."
+    )
+    COMBINE_NOTE = (
+        "The content was too long to answer at once, so it was split into parts and each part was "
+        "answered separately. Combine the answers to the parts below into a single answer."
+    )
+
+    def __init__(self, project_name: str, requests_per_minute: float = 500, tokens_per_minute: float = 200000):
         super().__init__(project_name)
         self._logger = logging.getLogger(__name__)
-        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        # One client for the node's lifetime; retries are handled by the rate limiter below.
+        self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=0)
+        self._rate_limiter = RateLimitOperator(requests_per_minute, tokens_per_minute)
+        self._response_cache = LlmCacheOperator(cache_duration=self.RESPONSE_CACHE_DURATION)
 
     def _load_data_item(self, file_path: str) -> Union[Page, AmazonProduct]:
         if "page" in file_path:
@@ -33,126 +96,399 @@ class OpenAINode(BaseNode):
         else:
             raise ValueError(f"Unsupported input type for file: {file_path}")
 
-    def _process_item(self, item: Any) -> Any:
+    def _iter_process(self, context: NodeContext) -> Iterator[Any]:
+        """Process the input, first answering its prompts together when the batch or pack kwarg is set.
+
+        In that case the items are processed twice. The first pass only collects the requests
+        that neither the item cache nor the response cache can answer. They are packed and
+        submitted as batches or sent concurrently, and the answers are kept in the context.
+        The second pass is a normal run in which every request is answered from the context,
+        so the output keeps the input order. Requests that got no answer fall back to
+        synchronous calls, and items an interrupted run completed are not sent again.
+
+        Args:
+            context: The context of the current run.
+
+        Yields:
+            The processed items in input order.
+        """
+        batch = context.get("batch", self.BATCH)
+        pack = context.get("pack", self.PACK)
+        if batch or pack:
+            context.input_data = list(context.input_data)
+            context.pending_requests = {}
+            context.prefetched_responses = {}
+            yield from super()._iter_process(self._prefetch(context, batch, pack))
+        else:
+            yield from super()._iter_process(context)
+
+    def _prefetch(self, context: NodeContext, batch: bool, pack: bool) -> NodeContext:
+        """Run the first pass: collect the outstanding requests, then answer them together.
+
+        Args:
+            context: The context of the current run.
+            batch: Whether the requests are submitted through the Batch API.
+            pack: Whether small requests are packed together.
+
+        Returns:
+            The context, with the answers to its requests.
+        """
+        completed = self._recover(context) if os.path.isdir(context.output_path) else {}
+        # Items the item cache answers are reused by the second pass without a request.
+        self._open_item_cache(context)
+        for index, item in enumerate(context.input_data):
+            if index not in completed:
+                self._process_item_cached(item, context)
+        pending: Dict[str, PendingPrompt] = context.pending_requests
+        context.pending_requests = None
+        if not pending:
+            return context
+
+        if pack:
+            requests, packs = self._pack(pending, context)
+            context.count("packed_prompts", sum(len(keys) for keys in packs.values()))
+        else:
+            requests, packs = {key: request for key, (request, _, _) in pending.items()}, {}
+        self._logger.info(f"Sending {len(pending)} prompts in {len(requests)} requests")
+
+        if batch:
+            context.count("batch_requests", len(requests))
+            operator = OpenAIBatchOperator(
+                self.client,
+                context.get("batch_poll_interval", self.BATCH_POLL_INTERVAL),
+                context.get("batch_timeout", self.BATCH_TIMEOUT),
+            )
+            responses = operator.run(requests)
+        else:
+            responses = self._send_all(requests, context)
+
+        use_cache = context.get("response_cache", self.RESPONSE_CACHE)
+        for request_key, message in responses.items():
+            answers = self._unpack(message, packs[request_key]) if request_key in packs else {request_key: message}
+            for cache_key, answer in answers.items():
+                context.prefetched_responses[cache_key] = answer
+                if use_cache:
+                    self._response_cache.put(cache_key, pending[cache_key][0]["model"], answer)
+        return context
+
+    def _send_all(self, requests: Dict[str, dict], context: NodeContext) -> Dict[str, str]:
+        """Send requests concurrently within the rate limits.
+
+        Args:
+            requests: The ``chat.completions.create`` arguments of every request by request id.
+            context: The context of the current run.
+
+        Returns:
+            The response message of every request that succeeded, by request id.
+        """
+        executor = ExecutorOperator("thread", self._get_max_workers(context))
+        keys = list(requests)
+        outcomes = executor.imap(lambda key: self._create_chat_completion(**requests[key]), keys, len(keys))
+        responses = {}
+        for key, (completion, error) in zip(keys, outcomes):
+            if error is not None:
+                self._logger.error(f"Failed to generate response from OpenAI API. Error: {error}")
+            else:
+                responses[key] = completion.choices[0].message.content.strip()
+        return responses
+
+    def _pack(
+            self, pending: Dict[str, PendingPrompt], context: NodeContext
+    ) -> Tuple[Dict[str, dict], Dict[str, List[str]]]:
+        """Pack requests that only differ in their content into shared requests.
+
+        Every packed request asks for the max_tokens of each of its prompts, so a pack only
+        grows while those completion tokens fit the output limit of the model and, together
+        with the prompt, its context window. Prompts that cannot share a request are sent alone.
+
+        Args:
+            pending: The request, instruction and content of every prompt by cache key.
+            context: The context of the current run.
+
+        Returns:
+            The requests to send by request id, and the cache keys answered by every packed request.
+        """
+        max_items = context.get("pack_max_items", self.PACK_MAX_ITEMS)
+        max_tokens = context.get("pack_max_tokens", self.PACK_MAX_TOKENS)
+
+        groups: Dict[str, List[str]] = {}
+        for cache_key, (request, instruction, _) in pending.items():
+            shared = {name: value for name, value in request.items() if name != "messages"}
+            group = self._response_cache.key(
+                {"system": request["messages"][0]["content"], "instruction": instruction, "request": shared}
+            )
+            groups.setdefault(group, []).append(cache_key)
+
+        requests: Dict[str, dict] = {}
+        packs: Dict[str, List[str]] = {}
+
+        def flush(keys: List[str]) -> None:
+            if len(keys) == 1:
+                requests[keys[0]] = pending[keys[0]][0]
+            elif keys:
+                request = self._pack_request([pending[key] for key in keys])
+                request_key = self._response_cache.key(request)
+                requests[request_key] = request
+                packs[request_key] = keys
+
+        window_override = context.get("openai_parameters", {}).get("max_context_tokens")
+        for keys in groups.values():
+            request, instruction, _ = pending[keys[0]]
+            counter = TokenOperator(request["model"])
+            window = window_override or counter.context_window
+            completion_tokens = request["max_tokens"] + self.PACK_TOKENS_PER_ITEM
+            group_max_items = min(max_items, counter.max_output_tokens // completion_tokens)
+            # The system prompt and the packing instructions, which every packed request repeats.
+            prompt_tokens = counter.count_messages([
+                request["messages"][0],
+                {"content": self.PACK_PROMPT.format(instruction=instruction, count=max_items, items="")},
+            ])
+            current: List[str] = []
+            current_tokens = 0
+            for cache_key in keys:
+                tokens = counter.count(pending[cache_key][2])
+                count = len(current) + 1
+                per_item = self.PACK_PROMPT_TOKENS_PER_ITEM + completion_tokens
+                request_tokens = prompt_tokens + current_tokens + tokens + per_item * count
+                fits = count <= group_max_items and current_tokens + tokens <= max_tokens and request_tokens <= window
+                if current and not fits:
+                    flush(current)
+                    current, current_tokens = [], 0
+                current.append(cache_key)
+                current_tokens += tokens
+            flush(current)
+        return requests, packs
+
+    def _pack_request(self, prompts: List[PendingPrompt]) -> dict:
+        """Build one request that answers several prompts with the same instruction.
+
+        Args:
+            prompts: The request, instruction and content of every prompt.
+
+        Returns:
+            The arguments for ``chat.completions.create``.
+        """
+        request, instruction, _ = prompts[0]
+        items = "\n\n".join(f"Item {number}:\n{content}" for number, (_, _, content) in enumerate(prompts, 1))
+        user_prompt = self.PACK_PROMPT.format(instruction=instruction, count=len(prompts), items=items)
+        return dict(
+            request,
+            messages=[request["messages"][0], {"role": "user", "content": user_prompt}],
+            max_tokens=(request["max_tokens"] + self.PACK_TOKENS_PER_ITEM) * len(prompts),
+            response_format={"type": "json_object"},
+        )
+
+    def _unpack(self, message: str, keys: List[str]) -> Dict[str, str]:
+        """Split the answer to a packed request into the answers to its prompts.
+
+        Args:
+            message: The response message, a JSON object keyed by item number.
+            keys: The cache keys of the packed prompts, in item order.
+
+        Returns:
+            The answer to every prompt that was answered, by cache key.
+        """
+        try:
+            answers = json.loads(message)
+        except ValueError as e:
+            self._logger.warning(f"Failed to parse the answer to {len(keys)} packed prompts. Error: {e}")
+            return {}
+        if not isinstance(answers, dict):
+            self._logger.warning(f"The answer to {len(keys)} packed prompts is not a JSON object")
+            return {}
+
+        unpacked = {}
+        for number, cache_key in enumerate(keys, 1):
+            answer = answers.get(str(number))
+            if answer is None:
+                continue
+            answer = answer.strip() if isinstance(answer, str) else json.dumps(answer)
+            if answer:
+                unpacked[cache_key] = answer
+        if len(unpacked) < len(keys):
+            self._logger.warning(f"{len(keys) - len(unpacked)} of {len(keys)} packed prompts were not answered")
+        return unpacked
+
+    def _process_item(self, item: Any, context: NodeContext) -> Any:
         """Process a single item by constructing the appropriate prompt.
 
         Args:
             item: The item to process (Url, Page, Markdown, or AmazonProduct object).
+            context: The context of the current run.
 
         Returns:
             The processed item with the generated response.
         """
-        system_prompt = self._kwargs.get("system_prompt", "")
-        user_prompt = self._kwargs.get("user_prompt", "")
+        system_prompt = context.get("system_prompt", "")
+        user_prompt = context.get("user_prompt", "")
 
         if isinstance(item, Url):
-            return self._process_url(item, system_prompt, user_prompt)
+            return self._process_url(item, system_prompt, user_prompt, context)
         elif isinstance(item, Page):
-            return self._process_page(item, system_prompt, user_prompt)
+            return self._process_page(item, system_prompt, user_prompt, context)
         elif isinstance(item, Markdown):
-            return self._process_markdown(item, system_prompt, user_prompt)
+            return self._process_markdown(item, system_prompt, user_prompt, context)
         elif isinstance(item, AmazonProduct):
-            return self._process_amazon_product(item, system_prompt, user_prompt)
+            return self._process_amazon_product(item, system_prompt, user_prompt, context)
         else:
             raise ValueError(f"Unsupported item type: {type(item)}")
 
-    def _process_url(self, url: Url, system_prompt: str, user_prompt: str) -> OpenAIChat:
+    def _process_url(self, url: Url, system_prompt: str, user_prompt: str, context: NodeContext) -> OpenAIChat:
         """Process a Url object by constructing the prompt.
 
         Args:
             url: The Url object to process.
             system_prompt: The system prompt for the OpenAI API.
             user_prompt: The user prompt for the OpenAI API.
+            context: The context of the current run.
 
         Returns:
             An instance of OpenAIChat with the generated response.
         """
         try:
-            user_prompt = f"{user_prompt}\n\nURL: {url.address}"
-            response = self._generate_response(system_prompt=system_prompt, user_prompt=user_prompt)
-            return OpenAIChat(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+            return self._create_chat(system_prompt, user_prompt, f"URL: {url.address}", context)
         except Exception as e:
             self._logger.error(f"Failed to process URL: {url.address}. Error: {e}")
             return None
 
-    def _process_page(self, page: Page, system_prompt: str, user_prompt: str) -> OpenAIChat:
+    def _process_page(self, page: Page, system_prompt: str, user_prompt: str, context: NodeContext) -> OpenAIChat:
         """Process a Page object by constructing the prompt.
 
         Args:
             page: The Page object to process.
             system_prompt: The system prompt for the OpenAI API.
             user_prompt: The user prompt for the OpenAI API.
+            context: The context of the current run.
 
         Returns:
             An instance of OpenAIChat with the generated response.
         """
         try:
-            user_prompt = f"{user_prompt}\n\nWebpage content:\n{page.html}"
-            response = self._generate_response(system_prompt=system_prompt, user_prompt=user_prompt)
-            return OpenAIChat(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+            return self._create_chat(system_prompt, user_prompt, f"Webpage content:\n{page.html}", context)
         except Exception as e:
-            self._logger.error(f"Failed to process Page: {page.url}. Error: {e}")
+            self._logger.error(f"Failed to process Page: {page.address}. Error: {e}")
             return None
 
-    def _process_markdown(self, markdown: Markdown, system_prompt: str, user_prompt: str) -> OpenAIChat:
+    def _process_markdown(
+            self, markdown: Markdown, system_prompt: str, user_prompt: str, context: NodeContext
+    ) -> OpenAIChat:
         """Process a Markdown object by constructing the prompt.
 
         Args:
             markdown: The Markdown object to process.
             system_prompt: The system prompt for the OpenAI API.
             user_prompt: The user prompt for the OpenAI API.
+            context: The context of the current run.
 
         Returns:
             An instance of OpenAIChat with the generated response.
         """
         try:
-            user_prompt = f"{user_prompt}\n\nMarkdown content:\n{markdown.body}"
-            response = self._generate_response(system_prompt=system_prompt, user_prompt=user_prompt)
-            return OpenAIChat(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+            return self._create_chat(system_prompt, user_prompt, f"Markdown content:\n{markdown.body}", context)
         except Exception as e:
             self._logger.error(f"Failed to process Markdown: {markdown.address}. Error: {e}")
             return None
 
-    def _process_amazon_product(self, product: AmazonProduct, system_prompt: str, user_prompt: str) -> OpenAIChat:
+    def _process_amazon_product(
+            self, product: AmazonProduct, system_prompt: str, user_prompt: str, context: NodeContext
+    ) -> OpenAIChat:
         """Process an AmazonProduct object by constructing the prompt.
 
         Args:
             product: The AmazonProduct object to process.
             system_prompt: The system prompt for the OpenAI API.
             user_prompt: The user prompt for the OpenAI API.
+            context: The context of the current run.
 
         Returns:
             An instance of OpenAIChat with the generated response.
         """
         try:
-            user_prompt = f"{user_prompt}\n\nAmazon product details:\n{product.to_dict()}"
-            response = self._generate_response(system_prompt=system_prompt, user_prompt=user_prompt)
-            return OpenAIChat(system_prompt=system_prompt, user_prompt=user_prompt, response=response)
+            content = f"Amazon product details:\n{product.to_dict()}"
+            return self._create_chat(system_prompt, user_prompt, content, context)
         except Exception as e:
-            self._logger.error(f"Failed to process AmazonProduct: {product.url}. Error: {e}")
+            self._logger.error(f"Failed to process AmazonProduct: {product.address}. Error: {e}")
             return None
 
-    def _generate_response(self, system_prompt: str, user_prompt: str) -> str:
+    def _create_chat(
+            self, system_prompt: str, instruction: str, content: str, context: NodeContext
+    ) -> Optional[OpenAIChat]:
+        """Generate a response and wrap it together with its prompts.
+
+        Args:
+            system_prompt: The system prompt for the OpenAI API.
+            instruction: The user prompt for the OpenAI API.
+            content: The content the instruction applies to, appended to the user prompt.
+            context: The context of the current run.
+
+        Returns:
+            An instance of OpenAIChat with the generated response, or None if no response was generated.
+        """
+        response = self._answer(system_prompt, instruction, content, context)
+        if response is None:
+            return None
+        return OpenAIChat(system_prompt=system_prompt, user_prompt=self._join(instruction, content), response=response)
+
+    def _answer(self, system_prompt: str, instruction: str, content: str, context: NodeContext) -> Optional[str]:
+        """Answer a prompt, map-reducing content that does not fit in the context window of the model.
+
+        Oversized content is split into parts at paragraph boundaries, every part is answered
+        separately and the answers are combined by a final request, recursively if needed.
+
+        Args:
+            system_prompt: The system prompt for the OpenAI API.
+            instruction: The user prompt for the OpenAI API.
+            content: The content the instruction applies to.
+            context: The context of the current run.
+
+        Returns:
+            The response, or None if no response was generated.
+        """
+        openai_parameters = context.get("openai_parameters", {})
+        counter = TokenOperator(openai_parameters.get("model", self.DEFAULT_MODEL))
+        window = openai_parameters.get("max_context_tokens") or counter.context_window
+        available = window - openai_parameters.get("max_tokens", self.DEFAULT_MAX_TOKENS)
+        messages = [{"content": system_prompt}, {"content": self._join(instruction, content)}]
+        if counter.count_messages(messages) <= available:
+            return self._generate_response(system_prompt, instruction, content, context)
+
+        # The budget of a part leaves room for the longest part note.
+        part_instruction = f"{instruction}\n\n{self.PART_NOTE}"
+        overhead = counter.count_messages([{"content": system_prompt}, {"content": part_instruction + "\n\n"}])
+        parts = counter.split(content, available - overhead - 8)
+        context.count("chunked_prompts")
+        self._logger.info(f"Splitting a prompt of {counter.count(content)} tokens into {len(parts)} parts")
+        answers = [
+            self._generate_response(
+                system_prompt, part_instruction.format(part=number, parts=len(parts)), part, context
+            )
+            for number, part in enumerate(parts, 1)
+        ]
+        if any(answer is None for answer in answers):
+            return None
+        combined = "\n\n".join(f"Answer to part {number}:\n{answer}" for number, answer in enumerate(answers, 1))
+        return self._answer(system_prompt, f"{instruction}\n\n{self.COMBINE_NOTE}", combined, context)
+
+    @staticmethod
+    def _join(instruction: str, content: str) -> str:
+        return f"{instruction}\n\n{content}" if content else instruction
+
+    def _generate_response(
+            self, system_prompt: str, instruction: str, content: str, context: NodeContext
+    ) -> Optional[str]:
         """Generate a response using the OpenAI API.
 
         Args:
             system_prompt: The system prompt for the OpenAI API.
-            user_prompt: The user prompt for the OpenAI API.
-            **kwargs: Additional keyword arguments for the OpenAI API.
+            instruction: The user prompt for the OpenAI API.
+            content: The content the instruction applies to, appended to the user prompt.
+            context: The context of the current run.
 
         Returns:
             The generated response from the OpenAI API.
         """
         try:
-            client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-            openai_parameters = self._kwargs.get("openai_parameters", {})
-            # Truncate the user prompt if it exceeds the maximum context length
-            max_context_length = openai_parameters.get(
-                "max_context_length", 16000
-            )  # Adjust this value based on the model's limit
-            if len(user_prompt) > max_context_length:
-                user_prompt = user_prompt[:max_context_length]
-
+            openai_parameters = context.get("openai_parameters", {})
             messages = [
                 {
                     "role": "system",
@@ -160,47 +496,132 @@ class OpenAINode(BaseNode):
                 },
                 {
                     "role": "user",
-                    "content": user_prompt,
+                    "content": self._join(instruction, content),
                 },
             ]
 
-            openai_parameters = self._kwargs.get("openai_parameters", {})
-            chat_completion = client.chat.completions.create(
-                model=openai_parameters.get("model", "gpt-3.5-turbo"),
+            request = dict(
+                model=openai_parameters.get("model", self.DEFAULT_MODEL),
                 messages=messages,
                 temperature=openai_parameters.get("temperature", 0.7),
-                max_tokens=openai_parameters.get("max_tokens", 100),
+                max_tokens=openai_parameters.get("max_tokens", self.DEFAULT_MAX_TOKENS),
                 top_p=openai_parameters.get("top_p", 1.0),
                 frequency_penalty=openai_parameters.get("frequency_penalty", 0.0),
                 presence_penalty=openai_parameters.get("presence_penalty", 0.0),
             )
 
-            message = chat_completion.choices[0].message.content.strip()
+            cache_key = self._response_cache.key({"request": request, "openai_parameters": openai_parameters})
+            prefetched = context.prefetched_responses
+            if prefetched and cache_key in prefetched:
+                return prefetched[cache_key]
+
+            use_cache = context.get("response_cache", self.RESPONSE_CACHE)
+            if use_cache:
+                message = self._response_cache.get(cache_key)
+                if message is not None:
+                    context.count("response_cache_hits")
+                    if prefetched is not None:
+                        prefetched[cache_key] = message
+                    return message
+                context.count("response_cache_misses")
+
+            # During the first pass of a batched or packed run the request is only recorded.
+            pending = context.pending_requests
+            if pending is not None:
+                pending[cache_key] = (request, instruction, content)
+                return None
+
+            if context.get("stream", self.STREAM):
+                message = self._stream_chat_completion(request, context)
+            else:
+                chat_completion = self._create_chat_completion(**request)
+                message = chat_completion.choices[0].message.content.strip()
+            if use_cache:
+                self._response_cache.put(cache_key, request["model"], message)
             return message
 
         except Exception as e:
             self._logger.error(f"Failed to generate response from OpenAI API. Error: {e}")
             return None
 
-    def _save_data(self) -> None:
-        """Save the processed data to files."""
-        json_file_path = os.path.join(self._output_path, "all.json")
-        data = []
-        for index, item in enumerate(self._output_data):
-            if item is not None and item.response is not None:
-                file_name = f"payload_{index}.txt"
-                file_path = os.path.join(self._output_path, file_name)
-                item.save_payload(file_path, item.response)
-                entry = {
-                    "data_type": item.__class__.__name__,
-                    "system_prompt": item.system_prompt,
-                    "user_prompt": item.user_prompt,
-                    "response": item.response,
-                    "file_name": file_name,
-                }
-                data.append(entry)
-        with open(json_file_path, "w") as json_file:
-            json.dump(data, json_file, indent=4)
+    def _stream_chat_completion(self, request: dict, context: NodeContext) -> str:
+        """Stream a chat completion into the payload file of the current item as it is generated.
+
+        The time to the first token, the completion tokens and the tokens per second after the
+        first token are recorded as measurements of the item.
+
+        Args:
+            request: The arguments for ``chat.completions.create``.
+            context: The per-item context of the current run.
+
+        Returns:
+            The complete response message.
+        """
+        payload_path = None
+        if context.item_index is not None and context.output_path:
+            file_name = f"payload_{context.item_index}.{OpenAIChat.PAYLOAD_EXTENSION}"
+            payload_path = os.path.join(context.output_path, file_name)
+
+        started_at = time.monotonic()
+        first_token_at = None
+        completion_tokens = None
+        parts = []
+        stream = self._create_chat_completion(**request, stream=True, stream_options={"include_usage": True})
+        file = open(payload_path, "w", encoding="utf-8") if payload_path else None
+        try:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    completion_tokens = chunk.usage.completion_tokens
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(delta)
+                if file is not None:
+                    file.write(delta)
+                    file.flush()
+        finally:
+            if file is not None:
+                file.close()
+        finished_at = time.monotonic()
+
+        message = "".join(parts)
+        if completion_tokens is None:
+            completion_tokens = TokenOperator(request["model"]).count(message)
+        context.count("streamed_responses")
+        if first_token_at is not None:
+            context.measure("time_to_first_token", round(first_token_at - started_at, 3))
+            generation_time = finished_at - first_token_at
+            if generation_time > 0:
+                context.measure("tokens_per_second", round(completion_tokens / generation_time, 1))
+        context.measure("completion_tokens", completion_tokens)
+        return message.strip()
+
+    def _create_chat_completion(self, **request: Any) -> Any:
+        """Create a chat completion within the rate limits, retrying rejected and failed calls.
+
+        Args:
+            **request: The arguments for ``chat.completions.create``.
+
+        Returns:
+            The chat completion returned by the OpenAI API.
+        """
+        tokens = TokenOperator(request["model"]).count_messages(request["messages"]) + (request.get("max_tokens") or 0)
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._rate_limiter.acquire(tokens)
+            try:
+                raw_response = self.client.chat.completions.with_raw_response.create(**request)
+                self._rate_limiter.update_from_headers(raw_response.headers)
+                return raw_response.parse()
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                response = getattr(e, "response", None)
+                headers = response.headers if response is not None else {}
+                self._rate_limiter.update_from_headers(headers)
+                if attempt == self.MAX_RETRIES:
+                    raise
+                delay = self._rate_limiter.backoff(attempt, headers.get("retry-after"))
+                self._logger.warning(f"OpenAI API call failed with {e.__class__.__name__}, retrying in {delay:.1f}s")
 
     def _get_cache_duration(self) -> timedelta:
         return self.CACHE_DURATION
@@ -0,0 +1,159 @@
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import undetected_chromedriver as uc
+
+
+class _PooledDriver:
+    """A Chrome instance together with its private profile directory and usage count."""
+
+    def __init__(self, driver: uc.Chrome, profile_dir: str):
+        self.driver = driver
+        self.profile_dir = profile_dir
+        self.pages = 0
+
+
+class ChromeDriverOperator:
+    """Pool of long-lived undetected Chrome instances that are leased one URL at a time.
+
+    Each instance runs on its own temporary profile, so instances can render pages in
+    parallel. Instances are health-checked before they are handed out and are replaced
+    after ``max_pages`` pages or as soon as they stop responding.
+    """
+
+    def __init__(
+            self,
+            size: int = 2,
+            max_pages: int = 50,
+            page_load_timeout: int = 60,
+            browser_executable_path: Optional[str] = None,
+            profile_root: Optional[str] = None,
+    ):
+        """Initialize the pool. No browser is started until the first lease.
+
+        Args:
+            size: The maximum number of Chrome instances alive at the same time.
+            max_pages: The number of pages after which an instance is recycled.
+            page_load_timeout: The page load timeout in seconds.
+            browser_executable_path: The Chrome executable, defaults to CHROME_EXECUTABLE_PATH.
+            profile_root: The directory temporary profiles are created in, defaults to USER_DATA_ROOT_PATH.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._size = max(1, size)
+        self._max_pages = max_pages
+        self._page_load_timeout = page_load_timeout
+        self._browser_executable_path = browser_executable_path or os.getenv("CHROME_EXECUTABLE_PATH")
+        self._profile_root = profile_root or os.getenv("USER_DATA_ROOT_PATH")
+        self._idle: "queue.LifoQueue[_PooledDriver]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @contextmanager
+    def lease(self) -> Iterator[uc.Chrome]:
+        """Lease a healthy driver for the duration of the ``with`` block.
+
+        Yields:
+            A Chrome driver that is not used by anyone else until the block exits.
+        """
+        pooled = self._acquire()
+        try:
+            yield pooled.driver
+        except Exception:
+            self._release(pooled, healthy=self._is_healthy(pooled))
+            raise
+        else:
+            pooled.pages += 1
+            self._release(pooled, healthy=True)
+
+    def close(self) -> None:
+        """Quit all idle drivers and stop handing out new ones."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(pooled)
+
+    def _acquire(self) -> _PooledDriver:
+        if self._closed:
+            raise RuntimeError("The Chrome driver pool has been closed.")
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self._size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                # Wake up periodically: a discarded driver frees a slot without refilling the queue.
+                try:
+                    pooled = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+            if self._is_healthy(pooled):
+                return pooled
+            self._logger.warning("Discarding unresponsive Chrome driver")
+            self._discard(pooled)
+
+    def _release(self, pooled: _PooledDriver, healthy: bool) -> None:
+        if self._closed or not healthy or pooled.pages >= self._max_pages:
+            if healthy and pooled.pages >= self._max_pages:
+                self._logger.info(f"Recycling Chrome driver after {pooled.pages} pages")
+            self._discard(pooled)
+        else:
+            self._idle.put(pooled)
+
+    def _create(self) -> _PooledDriver:
+        profile_dir = tempfile.mkdtemp(prefix="chrome_profile_", dir=self._profile_root)
+        try:
+            driver = uc.Chrome(
+                browser_executable_path=self._browser_executable_path,
+                user_data_dir=profile_dir,
+                use_subprocess=True,
+            )
+            driver.set_page_load_timeout(self._page_load_timeout)
+            driver.get("about:blank")
+            time.sleep(1)
+        except Exception:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+        self._logger.info(f"Started Chrome driver with profile {profile_dir}")
+        return _PooledDriver(driver, profile_dir)
+
+    def _discard(self, pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            self._logger.warning(f"Failed to quit Chrome driver cleanly. Error: {e}")
+        finally:
+            shutil.rmtree(pooled.profile_dir, ignore_errors=True)
+            with self._lock:
+                self._created -= 1
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledDriver) -> bool:
+        try:
+            return bool(pooled.driver.window_handles)
+        except Exception:
+            return False
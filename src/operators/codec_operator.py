@@ -0,0 +1,186 @@
+import codecs
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CodecOperator:
+    """Encodes and decodes the JSON of node records with the fastest available library.
+
+    ``orjson`` is used when it is installed and the standard library otherwise, overridable
+    with the JSON_CODEC environment variable; either reads what the other writes, except that
+    orjson reads integers beyond 64 bits as floats. Output is compact unless indentation is
+    asked for. Legacy ``all.json`` arrays are parsed incrementally, so their records are
+    yielded while the file is still being read.
+    """
+
+    BACKENDS = ("orjson", "json")
+    DEFAULT_BACKEND = "orjson" if orjson is not None else "json"
+    # Bytes read at a time by iter_array. Reads double while a single value does not fit.
+    CHUNK_SIZE = 1024 * 1024
+
+    _shared: Optional["CodecOperator"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, backend: Optional[str] = None, indent: bool = False):
+        """Initialize the codec.
+
+        Args:
+            backend: "orjson" or "json", defaults to JSON_CODEC or orjson when installed.
+            indent: Whether to indent the output for humans.
+
+        Raises:
+            ValueError: If the backend is unknown or not installed.
+        """
+        backend = backend or os.getenv("JSON_CODEC") or self.DEFAULT_BACKEND
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported JSON codec: {backend}. Expected one of {self.BACKENDS}.")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("The orjson codec requires the orjson package.")
+        self.backend = backend
+        self._indent = indent
+        if backend == "orjson":
+            self._options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+
+    @classmethod
+    def shared(cls) -> "CodecOperator":
+        """Get the compact codec shared by all operators of the current process.
+
+        Returns:
+            The process-wide codec.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode a value as UTF-8 JSON. Values JSON does not support are written as strings.
+
+        Args:
+            obj: The value.
+
+        Returns:
+            The encoded JSON.
+        """
+        if self.backend == "orjson":
+            try:
+                return orjson.dumps(obj, default=str, option=self._options)
+            except orjson.JSONEncodeError:
+                # Integers beyond 64 bits and lone surrogates are left to the standard library.
+                pass
+        indent = 2 if self._indent else None
+        separators = None if self._indent else (",", ":")
+        try:
+            text = json.dumps(obj, default=str, ensure_ascii=False, indent=indent, separators=separators)
+            return text.encode("utf-8")
+        except UnicodeEncodeError:
+            return json.dumps(obj, default=str, indent=indent, separators=separators).encode("ascii")
+
+    def loads(self, data: Any) -> Any:
+        """Decode JSON.
+
+        Args:
+            data: The JSON as bytes or str.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            ValueError: If the data is not valid JSON.
+        """
+        if self.backend == "orjson":
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # Escaped lone surrogates are valid JSON that only the standard library reads.
+                pass
+        return json.loads(data)
+
+    def iter_array(self, file: BinaryIO) -> Iterator[Any]:
+        """Yield the elements of a JSON array file one at a time, reading it in chunks.
+
+        Args:
+            file: The file, opened in binary mode.
+
+        Yields:
+            The decoded elements, in order.
+
+        Raises:
+            ValueError: If the file does not hold a JSON array.
+        """
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        position = 0
+        chunk_size = self.CHUNK_SIZE
+        eof = False
+
+        def fill() -> None:
+            nonlocal buffer, position, eof
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + text.decode(chunk, final=eof)
+            position = 0
+
+        def skip_whitespace() -> bool:
+            # Move to the next significant character; False once the input is exhausted.
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer):
+                    return True
+                if eof:
+                    return False
+                fill()
+
+        if not skip_whitespace() or buffer[position] != "[":
+            raise ValueError("Expected a JSON array.")
+        position += 1
+        if not skip_whitespace():
+            raise ValueError("Unterminated JSON array.")
+        closed = buffer[position] == "]"
+        if closed:
+            position += 1
+        while not closed:
+            # An element starts here: at the start of the array or right after a comma.
+            if not skip_whitespace():
+                raise ValueError("Unterminated JSON array.")
+            if buffer[position] in ",]":
+                raise ValueError(f"Expected an array element, found {buffer[position]!r}.")
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if eof:
+                    raise
+                value, end = None, len(buffer)
+            # A value is complete once a separator follows it: a number cut off by the end of the
+            # buffer ("4." of "4.5") also decodes, so read more and decode it again otherwise.
+            following = end
+            while following < len(buffer) and buffer[following] in " \t\r\n":
+                following += 1
+            if following >= len(buffer) or buffer[following] not in ",]":
+                if not eof:
+                    chunk_size = max(chunk_size, len(buffer) - position)
+                    fill()
+                    continue
+                if following >= len(buffer):
+                    raise ValueError("Unterminated JSON array.")
+                raise ValueError(f"Expected ',' or ']' after an array element, found {buffer[following]!r}.")
+            chunk_size = self.CHUNK_SIZE
+            position = end
+            yield value
+            # The separator checked above.
+            skip_whitespace()
+            closed = buffer[position] == "]"
+            position += 1
+        if skip_whitespace():
+            raise ValueError(f"Unexpected data after the JSON array, found {buffer[position]!r}.")
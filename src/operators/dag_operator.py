@@ -0,0 +1,136 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class _Task:
+    """A named callable together with the names of the tasks whose results it takes."""
+
+    def __init__(self, name: str, func: Callable[..., Any], depends_on: Tuple[str, ...]):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or 0.0) - (self.started_at or 0.0)
+
+
+class DagOperator:
+    """Runs a dependency graph of tasks with as much parallelism as the graph allows.
+
+    Every task starts as soon as all of its dependencies have finished and is called with
+    their results, in the order the dependencies were declared. Tasks run in threads, so
+    they should spend their time in I/O or in the worker pools of the nodes they call.
+    After a run the critical path, the chain of tasks that determined the total duration,
+    is logged and available through ``critical_path``.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """Initialize an empty graph.
+
+        Args:
+            max_workers: The maximum number of tasks running at the same time, unbounded if None.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._max_workers = max_workers
+        self._tasks: Dict[str, _Task] = {}
+
+    def add(self, name: str, func: Callable[..., Any], depends_on: Sequence[str] = ()) -> "DagOperator":
+        """Add a task to the graph.
+
+        Dependencies must be added before the tasks that depend on them, which keeps the
+        graph acyclic by construction.
+
+        Args:
+            name: The unique name of the task.
+            func: The callable to run. It receives the results of its dependencies.
+            depends_on: The names of the tasks that must finish first.
+
+        Returns:
+            The operator, so calls can be chained.
+
+        Raises:
+            ValueError: If the name is already taken or a dependency is unknown.
+        """
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        unknown = [dependency for dependency in depends_on if dependency not in self._tasks]
+        if unknown:
+            raise ValueError(f"Task {name} depends on unknown tasks: {unknown}")
+        self._tasks[name] = _Task(name, func, tuple(depends_on))
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """Run every task of the graph.
+
+        When a task fails no further tasks are started, the running ones are awaited and
+        the first error is re-raised.
+
+        Returns:
+            The result of every task by name.
+
+        Raises:
+            Exception: The first exception raised by a task.
+        """
+        results: Dict[str, Any] = {}
+        waiting = dict(self._tasks)
+        running: Dict[Future, _Task] = {}
+        error: Optional[BaseException] = None
+        started_at = time.monotonic()
+        for task in self._tasks.values():
+            task.started_at = task.finished_at = None
+
+        max_workers = self._max_workers or max(1, len(self._tasks))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dag") as pool:
+            while waiting or running:
+                if error is None:
+                    for task in [task for task in waiting.values() if all(d in results for d in task.depends_on)]:
+                        del waiting[task.name]
+                        running[pool.submit(self._run_task, task, [results[d] for d in task.depends_on])] = task
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        results[task.name] = future.result()
+                        self._logger.info(f"Task {task.name} finished in {task.duration:.2f}s")
+                    except Exception as e:
+                        self._logger.error(f"Task {task.name} failed after {task.duration:.2f}s. Error: {e}")
+                        if error is None:
+                            error = e
+
+        if error is not None:
+            raise error
+        self._log_critical_path(time.monotonic() - started_at)
+        return results
+
+    @property
+    def critical_path(self) -> List[Tuple[str, float]]:
+        """The (name, duration) of the tasks on the critical path of the last run, in execution order."""
+        finished = [task for task in self._tasks.values() if task.finished_at is not None]
+        if not finished:
+            return []
+        task = max(finished, key=lambda t: t.finished_at)
+        path = [task]
+        while task.depends_on:
+            task = max((self._tasks[d] for d in task.depends_on), key=lambda t: t.finished_at)
+            path.append(task)
+        return [(task.name, task.duration) for task in reversed(path)]
+
+    @staticmethod
+    def _run_task(task: _Task, arguments: List[Any]) -> Any:
+        task.started_at = time.monotonic()
+        try:
+            return task.func(*arguments)
+        finally:
+            task.finished_at = time.monotonic()
+
+    def _log_critical_path(self, elapsed: float) -> None:
+        path = " -> ".join(f"{name} ({duration:.2f}s)" for name, duration in self.critical_path)
+        self._logger.info(f"Graph finished in {elapsed:.2f}s. Critical path: {path}")
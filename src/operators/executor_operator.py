@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+ItemError = Tuple[int, Exception]
+
+_worker_func: Optional[Callable[[Any], Any]] = None
+
+
+def _capture(func: Callable[[Any], Any], item: Any) -> Tuple[Any, Optional[Exception]]:
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, e
+
+
+def _init_worker(func: Callable[[Any], Any]) -> None:
+    global _worker_func
+    _worker_func = func
+
+
+def _call_worker(item: Any) -> Tuple[Any, Optional[Exception]]:
+    return _capture(_worker_func, item)
+
+
+class ExecutorOperator:
+    """Maps a function over items with a serial, thread, process or asyncio backend.
+
+    Results are always returned in input order. An exception raised for one item does not
+    stop the others: the item's result is ``None`` and the exception is reported together
+    with the item's index.
+    """
+
+    BACKENDS = ("serial", "thread", "process", "async")
+    DEFAULT_ASYNC_WORKERS = 32
+
+    def __init__(self, backend: str = "serial", max_workers: Optional[int] = None):
+        """Initialize the executor.
+
+        Args:
+            backend: One of "serial", "thread", "process" or "async".
+            max_workers: The maximum number of items processed at the same time.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported executor backend: {backend}. Expected one of {self.BACKENDS}.")
+        self._backend = backend
+        self._max_workers = max_workers
+
+    def map(self, func: Callable[[Any], Any], items: List[Any]) -> Tuple[List[Any], List[ItemError]]:
+        """Apply ``func`` to every item.
+
+        With the process backend ``func`` is pickled once per worker, so it must be a
+        module-level function or a method of a picklable object. With the async backend
+        coroutine functions are awaited directly and plain functions run in threads.
+
+        Args:
+            func: The function to apply.
+            items: The items to apply it to.
+
+        Returns:
+            The results in input order and the (index, exception) pairs of failed items.
+        """
+        outcomes = list(self.imap(func, items, window=max(1, len(items))))
+        results = [result for result, _ in outcomes]
+        errors = [(index, error) for index, (_, error) in enumerate(outcomes) if error is not None]
+        return results, errors
+
+    def imap(
+            self, func: Callable[[Any], Any], items: Iterable[Any], window: int = 64
+    ) -> Iterator[Tuple[Any, Optional[Exception]]]:
+        """Lazily apply ``func`` to the items of a possibly unbounded iterable.
+
+        At most ``window`` items are taken from the iterable ahead of the item being
+        yielded, which bounds memory and applies backpressure to the producer.
+
+        Args:
+            func: The function to apply.
+            items: The items to apply it to.
+            window: The maximum number of items in flight.
+
+        Yields:
+            A (result, exception) pair per item, in input order.
+        """
+        if self._backend == "serial" or self._max_workers == 1:
+            for item in items:
+                yield _capture(func, item)
+            return
+
+        submit, shutdown = self._start(func)
+        pending: Deque[Future] = deque()
+        try:
+            for item in items:
+                pending.append(submit(item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            shutdown()
+
+    def _start(self, func: Callable[[Any], Any]) -> Tuple[Callable[[Any], Future], Callable[[], None]]:
+        if self._backend == "thread":
+            pool = ThreadPoolExecutor(max_workers=self._max_workers)
+            return lambda item: pool.submit(_capture, func, item), pool.shutdown
+        if self._backend == "process":
+            pool = ProcessPoolExecutor(max_workers=self._max_workers, initializer=_init_worker, initargs=(func,))
+            return lambda item: pool.submit(_call_worker, item), pool.shutdown
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        semaphore = asyncio.run_coroutine_threadsafe(
+            self._create_semaphore(self._max_workers or self.DEFAULT_ASYNC_WORKERS), loop
+        ).result()
+
+        def submit(item: Any) -> Future:
+            return asyncio.run_coroutine_threadsafe(self._run_async(func, item, semaphore), loop)
+
+        def shutdown() -> None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+        return submit, shutdown
+
+    @staticmethod
+    async def _create_semaphore(value: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(value)
+
+    @staticmethod
+    async def _run_async(
+            func: Callable[[Any], Any], item: Any, semaphore: asyncio.Semaphore
+    ) -> Tuple[Any, Optional[Exception]]:
+        async with semaphore:
+            if not asyncio.iscoroutinefunction(func):
+                return await asyncio.to_thread(_capture, func, item)
+            try:
+                return await func(item), None
+            except Exception as e:
+                return None, e
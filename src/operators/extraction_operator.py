@@ -0,0 +1,238 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+_COMBINATOR = re.compile(r"\s*[>+~]\s*|\s+")
+_ID = re.compile(r"#([\w-]+)")
+_CLASS = re.compile(r"\.([\w-]+)")
+_TAG = re.compile(r"^([a-zA-Z][\w-]*)")
+
+
+def _exclude(argument: str) -> Callable[[str], Optional[str]]:
+    return lambda value: None if argument in value else value
+
+
+def _trim_after(argument: str) -> Callable[[str], Optional[str]]:
+    return lambda value: value.split(argument)[0]
+
+
+def _append(argument: str) -> Callable[[str], Optional[str]]:
+    return lambda value: value + argument
+
+
+def _regex(argument: str) -> Callable[[str], Optional[str]]:
+    pattern = re.compile(argument)
+
+    def transform(value: str) -> Optional[str]:
+        match = pattern.search(value)
+        if match is None:
+            return None
+        return match.group(1) if pattern.groups else match.group(0)
+
+    return transform
+
+
+def _collapse_whitespace(argument: str) -> Callable[[str], Optional[str]]:
+    return lambda value: " ".join(value.split())
+
+
+class _AnchorExit(str):
+    """Marks the end of an anchor element on the traversal stack."""
+
+
+class _Rule:
+    """A compiled field rule."""
+
+    def __init__(self, field: str, spec: dict):
+        self.field = field
+        self.source = spec.get("source", "document")
+        self.selector = spec.get("selector")
+        self.compiled = soupsieve.compile(self.selector) if self.selector else None
+        self.attribute = spec.get("attribute")
+        self.many = spec.get("many", False)
+        self.default = spec.get("default", [] if self.many else "")
+        self.transforms = [ExtractionOperator.compile_transform(name) for name in spec.get("transforms", [])]
+        self.anchor: Optional[str] = None
+
+    def value_of(self, element: Tag) -> Optional[str]:
+        if self.attribute:
+            value = element.get(self.attribute)
+            if isinstance(value, list):
+                value = " ".join(value)
+        else:
+            value = element.get_text(strip=True)
+        return self.apply(value)
+
+    def apply(self, value: Optional[str]) -> Optional[str]:
+        for transform in self.transforms:
+            if value is None:
+                break
+            value = transform(value)
+        return value
+
+
+class ExtractionOperator:
+    """Extracts fields from a document with declarative rules in a single traversal.
+
+    A rule maps a field to a CSS selector, an optional attribute (the element text by
+    default), whether all matches or only the first are kept, and a list of transforms
+    applied to every value. Fields with ``"source": "address"`` are derived from the page
+    address instead of the document.
+
+    Rules are compiled once. Each rule is indexed by the id, class or tag its selector
+    requires of the matched element, and a selector such as ``#altImages img`` is anchored
+    to the element with the id it starts with. Walking the document once then only tests an
+    element against the few rules that can possibly match it, so rules whose anchor is not
+    on the page cost nothing. Selectors that cannot be indexed (selector lists, attribute or
+    pseudo-class selectors) are tested against every element.
+    """
+
+    TRANSFORMS: Dict[str, Callable[[str], Callable[[str], Optional[str]]]] = {
+        "exclude": _exclude,
+        "trim_after": _trim_after,
+        "append": _append,
+        "regex": _regex,
+        "collapse_whitespace": _collapse_whitespace,
+    }
+
+    def __init__(self, fields: Dict[str, dict]):
+        """Compile a set of field rules.
+
+        Args:
+            fields: The rule of every field by field name.
+
+        Raises:
+            ValueError: If a rule uses an unknown transform or has no selector.
+        """
+        self._rules = [_Rule(field, spec) for field, spec in fields.items()]
+        self._address_rules = [rule for rule in self._rules if rule.source == "address"]
+        self._document_rules = [rule for rule in self._rules if rule.source != "address"]
+        self._by_id: Dict[str, List[_Rule]] = {}
+        self._by_class: Dict[str, List[_Rule]] = {}
+        self._by_tag: Dict[str, List[_Rule]] = {}
+        self._unindexed: List[_Rule] = []
+        self._anchors = set()
+
+        for rule in self._document_rules:
+            if rule.compiled is None:
+                raise ValueError(f"Rule for field {rule.field} has no selector.")
+            kind, key = self._dispatch_key(rule.selector)
+            rule.anchor = self._anchor(rule.selector)
+            if rule.anchor is not None:
+                self._anchors.add(rule.anchor)
+            index = {"id": self._by_id, "class": self._by_class, "tag": self._by_tag}.get(kind)
+            if index is None:
+                self._unindexed.append(rule)
+            else:
+                index.setdefault(key, []).append(rule)
+
+    @classmethod
+    def compile_transform(cls, name: str) -> Callable[[str], Optional[str]]:
+        """Compile a transform such as "collapse_whitespace", "exclude:360_icon" or "trim_after:._".
+
+        Args:
+            name: The transform name, followed by its argument after a colon.
+
+        Returns:
+            A function mapping a value to the transformed value, or to None to drop it.
+
+        Raises:
+            ValueError: If the transform is unknown.
+        """
+        transform_name, _, argument = name.partition(":")
+        factory = cls.TRANSFORMS.get(transform_name)
+        if factory is None:
+            raise ValueError(f"Unknown extraction transform: {transform_name}. Expected one of {list(cls.TRANSFORMS)}.")
+        return factory(argument)
+
+    def extract(self, soup: BeautifulSoup, address: str = "") -> Dict[str, Any]:
+        """Extract all fields from a document.
+
+        Args:
+            soup: The parsed document.
+            address: The address of the page, for rules with ``"source": "address"``.
+
+        Returns:
+            The value of every field. Fields with ``"many": true`` hold a list of values.
+        """
+        values: Dict[str, Any] = {rule.field: [] for rule in self._rules if rule.many}
+        pending = {rule.field for rule in self._document_rules if not rule.many}
+        has_many = any(rule.many for rule in self._document_rules)
+
+        # The number of open elements with each anchor id, i.e. the anchors of the current element.
+        active: Dict[str, int] = {}
+        stack: list = [soup]
+        while stack:
+            element = stack.pop()
+            if isinstance(element, str):
+                if type(element) is _AnchorExit:
+                    active[element] -= 1
+                continue
+            element_id = element.get("id")
+            if element_id in self._anchors:
+                active[element_id] = active.get(element_id, 0) + 1
+                stack.append(_AnchorExit(element_id))
+            stack.extend(reversed(element.contents))
+
+            for rule in self._candidates(element):
+                if not rule.many and rule.field not in pending:
+                    continue
+                if rule.anchor is not None and not active.get(rule.anchor):
+                    continue
+                if not rule.compiled.match(element):
+                    continue
+                value = rule.value_of(element)
+                if rule.many:
+                    if value is not None:
+                        values[rule.field].append(value)
+                else:
+                    # Like select_one, the first match in document order wins.
+                    values[rule.field] = value
+                    pending.discard(rule.field)
+            if not pending and not has_many:
+                break
+
+        for rule in self._address_rules:
+            value = rule.apply(address)
+            values[rule.field] = ([value] if value is not None else []) if rule.many else value
+        for rule in self._rules:
+            if values.get(rule.field) is None or (rule.many and not values[rule.field]):
+                values[rule.field] = list(rule.default) if rule.many else rule.default
+        return values
+
+    def _candidates(self, element: Tag) -> List[_Rule]:
+        candidates = self._by_tag.get(element.name, [])
+        element_id = element.get("id")
+        if element_id in self._by_id:
+            candidates = candidates + self._by_id[element_id]
+        for class_name in element.get("class", ()):
+            if class_name in self._by_class:
+                candidates = candidates + self._by_class[class_name]
+        return candidates + self._unindexed if self._unindexed else candidates
+
+    @staticmethod
+    def _anchor(selector: str) -> Optional[str]:
+        # The id of the ancestor a descendant or child selector starts from. Sibling
+        # combinators match outside that subtree, so they leave the rule unanchored.
+        if any(character in selector for character in ",[]():\"'+~"):
+            return None
+        compounds = _COMBINATOR.split(selector.strip())
+        if len(compounds) < 2:
+            return None
+        match = _ID.search(compounds[0])
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _dispatch_key(selector: str) -> Tuple[Optional[str], Optional[str]]:
+        # Only plain compound selectors are indexed; anything with a selector list, attribute
+        # or pseudo-class selector is tested against every element instead.
+        if any(character in selector for character in ",[]():\"'"):
+            return None, None
+        compound = _COMBINATOR.split(selector.strip())[-1]
+        for kind, pattern in (("id", _ID), ("class", _CLASS), ("tag", _TAG)):
+            match = pattern.search(compound)
+            if match:
+                return kind, match.group(1)
+        return None, None
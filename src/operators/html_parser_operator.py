@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401 - only needed so BeautifulSoup can use the lxml tree builder
+    DEFAULT_BACKEND = "lxml"
+except ImportError:
+    DEFAULT_BACKEND = "html.parser"
+
+
+class HtmlParserOperator:
+    """Parses HTML documents once and shares the trees through a memory-bounded LRU cache.
+
+    Trees are keyed by the content of the document and the parser backend, so every node
+    that reads the same page in the same process reuses one tree. Cached trees are shared:
+    callers must treat them as read-only. Process pool workers each see different documents
+    of a run, so the shared parser of a worker process does not cache by default.
+    """
+
+    BACKENDS = ("lxml", "html.parser", "html5lib")
+    # A parsed tree takes roughly this many times the size of its source in memory.
+    TREE_SIZE_FACTOR = 10
+    DEFAULT_MAX_MEGABYTES = 256
+
+    _shared: Optional["HtmlParserOperator"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes: The estimated memory the cached trees may take, defaults to
+                HTML_PARSE_CACHE_MB megabytes (256 if unset). 0 disables the cache.
+        """
+        self._logger = logging.getLogger(__name__)
+        if max_bytes is None:
+            max_bytes = int(os.getenv("HTML_PARSE_CACHE_MB", self.DEFAULT_MAX_MEGABYTES)) * 1024 * 1024
+        self._max_bytes = max_bytes
+        self._trees: "OrderedDict[Tuple[bytes, str], Tuple[BeautifulSoup, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls) -> "HtmlParserOperator":
+        """Get the cache shared by all nodes of the current process.
+
+        In a child process, such as a process pool worker, the cache is off unless
+        HTML_PARSE_CACHE_MB is set, since no other node of the run reads the same pages there.
+
+        Returns:
+            The process-wide parser.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                in_worker = multiprocessing.parent_process() is not None
+                cls._shared = cls(0 if in_worker and os.getenv("HTML_PARSE_CACHE_MB") is None else None)
+            return cls._shared
+
+    def parse(self, html: str, backend: Optional[str] = None) -> BeautifulSoup:
+        """Parse a document, or return the cached tree of an identical document.
+
+        Args:
+            html: The HTML source.
+            backend: The parser backend, one of BACKENDS. Defaults to lxml when installed.
+
+        Returns:
+            The parsed, read-only tree.
+
+        Raises:
+            ValueError: If the backend is not supported.
+        """
+        backend = backend or DEFAULT_BACKEND
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported HTML parser backend: {backend}. Expected one of {self.BACKENDS}.")
+        if self._max_bytes <= 0:
+            return BeautifulSoup(html, backend)
+
+        key = (hashlib.sha1(html.encode("utf-8", "surrogatepass")).digest(), backend)
+        with self._lock:
+            entry = self._trees.get(key)
+            if entry is not None:
+                self._trees.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        soup = BeautifulSoup(html, backend)
+        size = len(html) * self.TREE_SIZE_FACTOR
+        with self._lock:
+            if key not in self._trees and size <= self._max_bytes:
+                self._trees[key] = (soup, size)
+                self._size += size
+                while self._size > self._max_bytes:
+                    _, (_, evicted_size) = self._trees.popitem(last=False)
+                    self._size -= evicted_size
+        return soup
+
+    @staticmethod
+    def parse_only(html: str, strainer: SoupStrainer, backend: Optional[str] = None) -> BeautifulSoup:
+        """Parse only the elements matched by a strainer, together with their descendants.
+
+        Partial trees are much cheaper to build than full ones and are not cached, since
+        they depend on the strainer. html5lib ignores strainers and builds the full tree.
+
+        Args:
+            html: The HTML source.
+            strainer: The elements to keep.
+            backend: The parser backend, one of BACKENDS. Defaults to lxml when installed.
+
+        Returns:
+            The partial tree.
+        """
+        return BeautifulSoup(html, backend or DEFAULT_BACKEND, parse_only=strainer)
+
+    def clear(self) -> None:
+        """Drop all cached trees."""
+        with self._lock:
+            self._trees.clear()
+            self._size = 0
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        # A forked worker must not inherit the parent's trees or its decision to cache.
+        cls._shared = None
+        cls._shared_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=HtmlParserOperator._reset_after_fork)
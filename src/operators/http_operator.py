@@ -0,0 +1,92 @@
+import logging
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import brotli  # noqa: F401 - only needed so urllib3/httpx can decode "br" responses
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class HttpOperator:
+    """Pooled HTTP client shared by all requests of its owner.
+
+    Connections are kept alive and reused, responses are negotiated with compression and
+    every request has a timeout. HTTP/2 is used when requested and ``httpx`` with ``h2``
+    is installed, otherwise the client falls back to a pooled ``requests`` session.
+    """
+
+    def __init__(self, pool_size: int = 32, timeout: Tuple[float, float] = (10.0, 30.0), http2: bool = False):
+        """Initialize the client.
+
+        Args:
+            pool_size: The maximum number of connections kept open per host.
+            timeout: The (connect, read) timeout in seconds.
+            http2: Whether to negotiate HTTP/2 when the server supports it.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._timeout = timeout
+        self._headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        self._session: Optional[requests.Session] = None
+        self._client = None
+
+        if http2:
+            self._client = self._create_http2_client(pool_size)
+        if self._client is None:
+            self._session = self._create_session(pool_size)
+
+    def get_text(self, url: str) -> str:
+        """Fetch the given URL and return the decoded response body.
+
+        Args:
+            url: The URL to fetch.
+
+        Returns:
+            The response body as text.
+        """
+        if self._client is not None:
+            response = self._client.get(url)
+        else:
+            response = self._session.get(url, timeout=self._timeout)
+        response.raise_for_status()
+        return response.text
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            self._client.close()
+        if self._session is not None:
+            self._session.close()
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self._headers)
+        return session
+
+    def _create_http2_client(self, pool_size: int):
+        if httpx is None:
+            self._logger.warning("httpx is not installed, falling back to HTTP/1.1")
+            return None
+        connect_timeout, read_timeout = self._timeout
+        try:
+            return httpx.Client(
+                http2=True,
+                headers=self._headers,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                follow_redirects=True,
+            )
+        except ImportError as e:
+            self._logger.warning(f"HTTP/2 support is not installed, falling back to HTTP/1.1. Error: {e}")
+            return None
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+from operators.codec_operator import CodecOperator
+from operators.sqlite_cache_operator import SqliteCacheOperator
+
+
+class ItemCacheOperator(SqliteCacheOperator):
+    """Content-addressed store of per-item node results.
+
+    Each result is stored under a hash of the node identity, the parameters that affect
+    the result and the content of the input item, so a result is reused whenever the same
+    item is processed again with the same parameters, whatever input list it belongs to.
+
+    All results of a node live in one SQLite file. The payload of a result (the HTML of a
+    page, the body of a markdown document, ...) is stored once as a blob addressed by its
+    own hash, so results with the same payload share it. Entries expire after
+    ``cache_duration``, expired entries are deleted when they are read, and the least
+    recently used entries are evicted once the stored results exceed ``max_bytes``.
+    """
+
+    TABLE = "entries"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "key TEXT PRIMARY KEY, record BLOB NOT NULL, payload_field TEXT, blob TEXT, size INTEGER NOT NULL, "
+        "created_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)",
+        "CREATE INDEX IF NOT EXISTS entries_blob ON entries (blob)",
+        "CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL)",
+    )
+    DESCRIPTION = "item cache"
+    MAX_MEGABYTES_VARIABLE = "ITEM_CACHE_MB"
+
+    def __init__(self, database_path: str, cache_duration: Optional[timedelta], max_bytes: Optional[int] = None):
+        """Initialize the item cache, creating the database on first use.
+
+        Args:
+            database_path: The SQLite file the cached results are stored in.
+            cache_duration: How long a cached result stays valid, or None if it never expires.
+            max_bytes: The maximum total size of the stored results, defaults to ITEM_CACHE_MB
+                megabytes (1024 if unset).
+        """
+        super().__init__(database_path, cache_duration, max_bytes)
+        self._logger = logging.getLogger(__name__)
+        self._codec = CodecOperator.shared()
+
+    @staticmethod
+    def key(node_identity: str, parameters: dict, item: Any) -> str:
+        """Compute the cache key of an item.
+
+        Args:
+            node_identity: The name identifying the node implementation.
+            parameters: The node parameters that affect the result.
+            item: The JSON-serializable content of the input item.
+
+        Returns:
+            The hex digest identifying the result.
+        """
+        hash_input = json.dumps([node_identity, parameters, item], sort_keys=True, default=str)
+        return hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get a cached result if it exists and has not expired. An expired result is deleted.
+
+        Args:
+            key: The cache key of the item.
+
+        Returns:
+            The cached result record with its payload, or None.
+        """
+        now = time.time()
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT entries.record, entries.payload_field, blobs.payload, entries.created_at "
+                "FROM entries LEFT JOIN blobs ON blobs.hash = entries.blob WHERE entries.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            record, payload_field, payload, created_at = row
+            if not self._touch(connection, key, created_at, now):
+                return None
+            record = self._codec.loads(record)
+        except (sqlite3.Error, ValueError) as e:
+            self._logger.warning(f"Ignoring unreadable item cache entry {key}. Error: {e}")
+            return None
+        if payload_field:
+            if payload is None:
+                # The blob was evicted while the entry was being read.
+                return None
+            record[payload_field] = payload
+        return record
+
+    def put(self, key: str, record: dict, payload_field: Optional[str] = None) -> None:
+        """Store a result record, replacing any previous one.
+
+        Args:
+            key: The cache key of the item.
+            record: The JSON-serializable result record.
+            payload_field: The field of the record holding its payload, stored as a shared blob.
+        """
+        record = dict(record)
+        payload = record.pop(payload_field, None) if payload_field else None
+        encoded = self._codec.dumps(record)
+        size = len(encoded)
+        blob = None
+        now = time.time()
+        try:
+            connection = self._connect()
+            if payload is not None:
+                data = payload.encode("utf-8")
+                blob = hashlib.sha256(data).hexdigest()
+                size += len(data)
+                connection.execute(
+                    "INSERT OR IGNORE INTO blobs (hash, payload, size) VALUES (?, ?, ?)", (blob, payload, len(data))
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, record, payload_field, blob, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, encoded, payload_field, blob, size, now, now),
+            )
+        except (sqlite3.Error, UnicodeEncodeError) as e:
+            self._logger.warning(f"Failed to store item cache entry {key}. Error: {e}")
+            return
+        self._stored()
+
+    def _after_evict(self, connection: sqlite3.Connection) -> None:
+        # Blobs no entry refers to any more, including those of entries expired on read.
+        connection.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT blob FROM entries WHERE blob IS NOT NULL)")
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from operators.sqlite_cache_operator import SqliteCacheOperator
+
+
+class LlmCacheOperator(SqliteCacheOperator):
+    """Persistent cache of LLM responses shared by all projects.
+
+    Responses are stored in SQLite under a hash of the complete request (model, sampling
+    parameters and exact messages), so a repeated prompt is answered from disk whatever
+    node folder or project it comes from. Entries expire after ``cache_duration`` and the
+    least recently used ones are evicted once the stored responses exceed ``max_bytes``.
+    """
+
+    TABLE = "responses"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, size INTEGER NOT NULL, "
+        "created_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)",
+    )
+    DESCRIPTION = "LLM response cache"
+    MAX_MEGABYTES_VARIABLE = "LLM_CACHE_MB"
+
+    def __init__(
+            self,
+            database_path: Optional[str] = None,
+            cache_duration: Optional[timedelta] = timedelta(days=30),
+            max_bytes: Optional[int] = None,
+    ):
+        """Initialize the cache, creating the database on first use.
+
+        Args:
+            database_path: The SQLite file, defaults to LLM_CACHE_PATH or
+                llm_cache.sqlite in the data root.
+            cache_duration: How long a response stays valid, or None if it never expires.
+            max_bytes: The maximum total size of the stored responses, defaults to
+                LLM_CACHE_MB megabytes (1024 if unset).
+        """
+        database_path = database_path or os.getenv("LLM_CACHE_PATH") or os.path.join(
+            os.getenv("PROJECT_DATA_ROOT_PATH", "data"), "llm_cache.sqlite"
+        )
+        super().__init__(database_path, cache_duration, max_bytes)
+        self._logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        """Compute the cache key of a request.
+
+        Args:
+            request: Everything that determines the response.
+
+        Returns:
+            The hex digest identifying the response.
+        """
+        hash_input = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(hash_input.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response if it exists and has not expired.
+
+        Args:
+            key: The cache key of the request.
+
+        Returns:
+            The cached response, or None.
+        """
+        now = time.time()
+        try:
+            connection = self._connect()
+            row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and not self._touch(connection, key, row[1], now):
+                row = None
+        except sqlite3.Error as e:
+            self._logger.warning(f"LLM response cache lookup failed. Error: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row is not None else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response.
+
+        Args:
+            key: The cache key of the request.
+            model: The model that produced the response.
+            response: The response text.
+        """
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+        except sqlite3.Error as e:
+            self._logger.warning(f"Failed to store LLM response in the cache. Error: {e}")
+            return
+        self._stored()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the hit and miss counts of this instance and the size of the whole cache.
+
+        Returns:
+            The hits, misses, hit rate, number of stored responses and their total size in bytes.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        count, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": size,
+        }
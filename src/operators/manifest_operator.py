@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Optional
+
+
+class ManifestOperator:
+    """Reads and writes the manifest that describes a node run's output folder.
+
+    The manifest is written with status "running" when a run starts and replaced with
+    status "complete" once every output file has been written, so a folder whose run was
+    interrupted never looks like a valid cache.
+    """
+
+    FILE_NAME = "manifest.json"
+    RUNNING = "running"
+    COMPLETE = "complete"
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+
+    def read(self, folder_path: str) -> Optional[dict]:
+        """Read the manifest of an output folder.
+
+        Args:
+            folder_path: The output folder.
+
+        Returns:
+            The manifest, or None if it is missing or unreadable.
+        """
+        file_path = os.path.join(folder_path, self.FILE_NAME)
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"Ignoring unreadable manifest {file_path}. Error: {e}")
+            return None
+
+    def write(self, folder_path: str, manifest: dict) -> None:
+        """Write the manifest of an output folder atomically.
+
+        Args:
+            folder_path: The output folder.
+            manifest: The JSON-serializable manifest.
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(dir=folder_path, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=4, default=str)
+            os.replace(temp_path, os.path.join(folder_path, self.FILE_NAME))
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def checksums(self, folder_path: str) -> Dict[str, str]:
+        """Compute the sha256 checksum of every file in an output folder except the manifest.
+
+        Args:
+            folder_path: The output folder.
+
+        Returns:
+            A mapping of file name to hex digest.
+        """
+        checksums = {}
+        for file_name in sorted(os.listdir(folder_path)):
+            file_path = os.path.join(folder_path, file_name)
+            if file_name == self.FILE_NAME or not os.path.isfile(file_path):
+                continue
+            digest = hashlib.sha256()
+            with open(file_path, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+            checksums[file_name] = digest.hexdigest()
+        return checksums
@@ -0,0 +1,319 @@
+import io
+import re
+from typing import List, TextIO
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+_WHITESPACE = re.compile(r"[ \t\r\n\f]+")
+_EXIT = object()
+
+
+class _MarkdownWriter:
+    """Writes Markdown text, deferring separators so nothing written has to be taken back.
+
+    Block separators, spaces and opening markers are only written once the text that
+    follows them arrives, which collapses whitespace around blocks, drops empty
+    emphasis and links, and prefixes every line with the active list and quote indent.
+    """
+
+    # Written text is handed to the stream in chunks of about this many characters.
+    CHUNK_SIZE = 65536
+
+    def __init__(self, out: TextIO):
+        self._out = out
+        self._parts: List[str] = []
+        self._size = 0
+        self._started = False
+        self._breaks = 0
+        self._break_prefix = ""
+        self._hard_break = False
+        self._space = False
+        self._markers: List[str] = []
+        self._prefixes: List[str] = []
+        self.inline_only = 0
+
+    @property
+    def prefix(self) -> str:
+        return "".join(self._prefixes)
+
+    def push_prefix(self, prefix: str) -> None:
+        self._prefixes.append(prefix)
+
+    def pop_prefix(self) -> None:
+        self._prefixes.pop()
+
+    def block(self, newlines: int) -> None:
+        if self.inline_only:
+            self.space()
+            return
+        # Of several pending separators, the outermost prefix starts the next line; an element
+        # that needs more on its first line (a list bullet, a quote marker) opens it as a marker.
+        prefix = self.prefix
+        if not self._breaks or len(prefix) < len(self._break_prefix):
+            self._break_prefix = prefix
+        self._breaks = max(self._breaks, newlines)
+        self._hard_break = False
+        self._space = False
+
+    def line_break(self) -> None:
+        # Markdown renders a single newline as a space; a line ending in two spaces breaks.
+        # Any other separator that follows replaces the hard break.
+        self.block(1)
+        if not self.inline_only:
+            self._hard_break = True
+
+    def space(self) -> None:
+        self._space = True
+
+    def open(self, marker: str) -> None:
+        self._markers.append(marker)
+
+    def close(self, opener: str, closer: str) -> None:
+        # An element without text leaves its opener pending; drop both instead of writing "****".
+        if self._markers and self._markers[-1] == opener:
+            self._markers.pop()
+        else:
+            self._write(closer)
+
+    def text(self, text: str) -> None:
+        if text.startswith(" "):
+            self._space = True
+        stripped = text.strip(" ")
+        if stripped:
+            self._flush_pending()
+            self._write(stripped)
+        if text.endswith(" ") and stripped:
+            self._space = True
+
+    def raw(self, text: str, keep_space: bool = True) -> None:
+        if not keep_space:
+            self._space = False
+        self._flush_pending()
+        self._write(text)
+
+    def finish(self) -> None:
+        if self._parts:
+            self._out.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+    def _write(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.CHUNK_SIZE:
+            self.finish()
+
+    def _flush_pending(self) -> None:
+        if self._breaks or not self._started:
+            if self._started:
+                blank = self._break_prefix.rstrip()
+                if self._breaks == 1 and self._hard_break:
+                    self._write("  ")
+                self._write(("\n" + blank) * (self._breaks - 1) + "\n")
+            self._write(self._break_prefix)
+        elif self._space:
+            self._write(" ")
+        self._started = True
+        self._breaks = 0
+        self._hard_break = False
+        self._space = False
+        if self._markers:
+            self._write("".join(self._markers))
+            self._markers.clear()
+
+
+class MarkdownOperator:
+    """Converts a parsed HTML tree to Markdown in a single pass over the tree.
+
+    The tree is walked iteratively, so deeply nested pages do not hit the recursion limit,
+    and the Markdown is written to a text stream as it is produced instead of being
+    assembled from the converted strings of every subtree.
+    """
+
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    BLOCKS = frozenset(
+        ("p", "div", "section", "article", "main", "figure", "figcaption", "dl", "dt", "dd", "address", "details")
+    )
+    EMPHASIS = {"b": "**", "strong": "**", "i": "*", "em": "*", "del": "~~", "s": "~~", "strike": "~~"}
+    # Never part of the readable content.
+    SKIPPED_TAGS = frozenset(("head", "script", "style", "noscript", "template"))
+    # Page chrome that is dropped when boilerplate stripping is enabled.
+    BOILERPLATE_TAGS = frozenset(("nav", "header", "footer", "aside", "form", "iframe", "svg", "button"))
+
+    def __init__(self, strip_boilerplate: bool = False):
+        """Initialize the converter.
+
+        Args:
+            strip_boilerplate: Whether to drop navigation, headers, footers, forms and similar page chrome.
+        """
+        self._skipped = self.SKIPPED_TAGS | self.BOILERPLATE_TAGS if strip_boilerplate else self.SKIPPED_TAGS
+
+    def convert(self, soup: BeautifulSoup) -> str:
+        """Convert a tree to a Markdown string.
+
+        Args:
+            soup: The parsed document or element.
+
+        Returns:
+            The Markdown text.
+        """
+        out = io.StringIO()
+        self.write(soup, out)
+        return out.getvalue()
+
+    def write(self, soup: BeautifulSoup, out: TextIO) -> None:
+        """Convert a tree to Markdown, writing it to a text stream.
+
+        The body of a document is converted if it has one. The tree is only read.
+
+        Args:
+            soup: The parsed document or element.
+            out: The stream to write to.
+        """
+        root = soup.body if isinstance(soup, BeautifulSoup) and soup.body else soup
+        writer = _MarkdownWriter(out)
+        # The context stacks of the open lists (ordered flag and item counter), tables
+        # (row and cell counts) and code spans, which disable escaping except of "|" in table
+        # cells, where it would end the cell.
+        lists: List[list] = []
+        tables: List[list] = []
+        code = 0
+
+        stack: list = list(reversed(root.contents)) if isinstance(root, Tag) else [root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, tuple):
+                code = self._leave(node[1], writer, lists, tables, code)
+                continue
+            if type(node) is NavigableString:
+                text = _WHITESPACE.sub(" ", node)
+                if not code:
+                    text = text.replace("*", r"\*").replace("_", r"\_")
+                if tables and writer.inline_only:
+                    text = text.replace("|", r"\|")
+                writer.text(text)
+                continue
+            if not isinstance(node, Tag) or node.name in self._skipped:
+                continue
+
+            name = node.name
+            if name == "pre":
+                self._write_pre(node, writer)
+                continue
+            if name == "br":
+                writer.line_break()
+                continue
+            if name == "hr":
+                writer.block(2)
+                writer.raw("---")
+                writer.block(2)
+                continue
+            if name == "img":
+                alt = _WHITESPACE.sub(" ", node.get("alt") or "").strip()
+                src = node.get("src") or ""
+                if src:
+                    writer.raw(f"![{alt}]({src})")
+                continue
+
+            code = self._enter(node, writer, lists, tables, code)
+            stack.append((_EXIT, node))
+            stack.extend(reversed(node.contents))
+        writer.finish()
+
+    def _enter(self, node: Tag, writer: _MarkdownWriter, lists: List[list], tables: List[list], code: int) -> int:
+        name = node.name
+        if name in self.BLOCKS:
+            writer.block(2)
+        elif name in self.HEADINGS:
+            writer.block(2)
+            writer.open("#" * self.HEADINGS[name] + " ")
+            writer.inline_only += 1
+        elif name in self.EMPHASIS:
+            writer.open(self.EMPHASIS[name])
+        elif name == "code":
+            writer.open("`")
+            code += 1
+        elif name == "a":
+            writer.open("[")
+        elif name in ("ul", "ol"):
+            writer.block(1 if lists else 2)
+            lists.append([name == "ol", 0])
+        elif name == "li":
+            writer.block(1)
+            if lists:
+                lists[-1][1] += 1
+                ordered, count = lists[-1]
+            else:
+                ordered, count = False, 1
+            marker = f"{count}. " if ordered else "* "
+            writer.open(marker)
+            writer.push_prefix(" " * len(marker))
+        elif name == "blockquote":
+            writer.block(2)
+            writer.open("> ")
+            writer.push_prefix("> ")
+        elif name == "table":
+            writer.block(2)
+            tables.append([0, 0])
+        elif name == "tr":
+            writer.block(1)
+            writer.raw("|", keep_space=False)
+            if tables:
+                tables[-1][1] = 0
+        elif name in ("td", "th"):
+            writer.space()
+            writer.inline_only += 1
+        return code
+
+    def _leave(self, node: Tag, writer: _MarkdownWriter, lists: List[list], tables: List[list], code: int) -> int:
+        name = node.name
+        if name in self.BLOCKS:
+            writer.block(2)
+        elif name in self.HEADINGS:
+            writer.inline_only -= 1
+            writer.close("#" * self.HEADINGS[name] + " ", "")
+            writer.block(2)
+        elif name in self.EMPHASIS:
+            writer.close(self.EMPHASIS[name], self.EMPHASIS[name])
+        elif name == "code":
+            writer.close("`", "`")
+            code -= 1
+        elif name == "a":
+            href = node.get("href")
+            writer.close("[", f"]({href})" if href else "]")
+        elif name in ("ul", "ol"):
+            if lists:
+                lists.pop()
+            writer.block(1 if lists else 2)
+        elif name == "li":
+            writer.pop_prefix()
+            writer.block(1)
+        elif name == "blockquote":
+            writer.pop_prefix()
+            writer.block(2)
+        elif name == "table":
+            if tables:
+                tables.pop()
+            writer.block(2)
+        elif name == "tr":
+            if tables:
+                tables[-1][0] += 1
+                if tables[-1][0] == 1:
+                    # Markdown tables need a separator after the first row.
+                    writer.block(1)
+                    writer.raw("|" + " --- |" * max(1, tables[-1][1]), keep_space=False)
+        elif name in ("td", "th"):
+            writer.inline_only -= 1
+            writer.raw(" |", keep_space=False)
+            if tables:
+                tables[-1][1] += 1
+        return code
+
+    @staticmethod
+    def _write_pre(node: Tag, writer: _MarkdownWriter) -> None:
+        text = node.get_text().strip("\n")
+        writer.block(2)
+        line_break = "\n" + writer.prefix
+        writer.raw("```" + line_break + text.replace("\n", line_break) + line_break + "```")
+        writer.block(2)
+
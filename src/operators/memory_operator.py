@@ -0,0 +1,97 @@
+import gc
+import logging
+import os
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class MemoryOperator:
+    """Tracks the resident memory of the process against a budget.
+
+    The resident set size is read from ``/proc/self/statm`` where available. Elsewhere only
+    the peak of the process is known (from ``getrusage``), which still gives a high-water
+    mark but cannot tell when the budget is exceeded.
+    """
+
+    # Memory is freed at most once per this many samples, since garbage collection of a large heap is slow.
+    RELIEF_INTERVAL = 32
+
+    def __init__(self, budget_bytes: int):
+        """Initialize the tracker.
+
+        Args:
+            budget_bytes: The resident memory the process should stay under.
+        """
+        self._logger = logging.getLogger(__name__)
+        self.budget_bytes = budget_bytes
+        self.high_water_bytes = self.rss() or self.peak() or 0
+        self.relief_count = 0
+        self._samples = 0
+        self._relieved_at: Optional[int] = None
+
+    @staticmethod
+    def rss() -> Optional[int]:
+        """Get the current resident memory of the process.
+
+        Returns:
+            The resident set size in bytes, or None if it cannot be measured.
+        """
+        try:
+            with open("/proc/self/statm", "r") as file:
+                return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    @staticmethod
+    def peak() -> Optional[int]:
+        """Get the peak resident memory of the process since it started.
+
+        Returns:
+            The peak resident set size in bytes, or None if it cannot be measured.
+        """
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if os.uname().sysname == "Darwin" else peak * 1024
+        return None
+
+    def window(self, item_bytes: int, maximum: int) -> int:
+        """Get the number of items that can be in flight within the budget.
+
+        Args:
+            item_bytes: The estimated memory an item takes while it is processed.
+            maximum: The largest window to return.
+
+        Returns:
+            The window size, at least 1.
+        """
+        available = self.budget_bytes - (self.rss() or 0)
+        if available <= 0:
+            self._logger.warning("The process already exceeds its memory budget; processing one item at a time")
+            return 1
+        return max(1, min(maximum, available // max(1, item_bytes)))
+
+    def sample(self, release: Optional[Callable[[], None]] = None) -> None:
+        """Update the high-water mark, freeing memory when the budget is exceeded.
+
+        Args:
+            release: Called to drop caches when the budget is exceeded, before garbage collection.
+        """
+        current = self.rss()
+        if current is None:
+            self.high_water_bytes = max(self.high_water_bytes, self.peak() or 0)
+            return
+        self.high_water_bytes = max(self.high_water_bytes, current)
+        self._samples += 1
+        if current <= self.budget_bytes:
+            return
+        if self._relieved_at is None or self._samples - self._relieved_at >= self.RELIEF_INTERVAL:
+            self._relieved_at = self._samples
+            self.relief_count += 1
+            if release is not None:
+                release()
+            gc.collect()
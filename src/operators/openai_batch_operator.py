@@ -0,0 +1,171 @@
+import io
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Union
+
+import openai
+from openai import OpenAI
+
+
+class OpenAIBatchOperator:
+    """Runs chat completion requests through the OpenAI Batch API.
+
+    Requests are written to JSONL batch files, uploaded and submitted together, then the
+    batches are polled until they end and their results are mapped back to the ids of the
+    requests. Batches complete within 24 hours at half the price of synchronous calls and
+    do not count against the synchronous rate limits. The client's base URL decides where
+    the files and batch endpoints live, so a local stand-in can replace the real API.
+    """
+
+    ENDPOINT = "/v1/chat/completions"
+    COMPLETION_WINDOW = "24h"
+    # The API limit on the number of requests in one batch file.
+    MAX_REQUESTS_PER_BATCH = 50000
+    FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+    # How long batches cancelled at the timeout are still polled, for the requests they completed.
+    CANCEL_GRACE = timedelta(minutes=10)
+
+    def __init__(
+            self,
+            client: OpenAI,
+            poll_interval: Union[float, timedelta] = 60,
+            timeout: Union[float, timedelta, None] = timedelta(hours=24),
+    ):
+        """Initialize the operator.
+
+        Args:
+            client: The OpenAI client to submit the batches with.
+            poll_interval: The time between status checks, in seconds or as a timedelta.
+            timeout: How long to wait for the batches before cancelling them, in seconds or as a
+                timedelta, or None to wait indefinitely.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._client = client
+        if isinstance(poll_interval, timedelta):
+            poll_interval = poll_interval.total_seconds()
+        self._poll_interval = poll_interval
+        if timeout is not None and not isinstance(timeout, timedelta):
+            timeout = timedelta(seconds=timeout)
+        self._timeout = timeout
+
+    def run(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Submit requests as batches and wait for their responses.
+
+        Args:
+            requests: The ``chat.completions.create`` arguments of every request by request id.
+
+        Returns:
+            The response message of every request that succeeded, by request id. Requests of
+            batches cancelled at the timeout are missing unless they completed before.
+        """
+        if not requests:
+            return {}
+        custom_ids = list(requests)
+        batch_ids = []
+        for start in range(0, len(custom_ids), self.MAX_REQUESTS_PER_BATCH):
+            chunk = custom_ids[start:start + self.MAX_REQUESTS_PER_BATCH]
+            batch_ids.append(self.submit({custom_id: requests[custom_id] for custom_id in chunk}))
+
+        responses: Dict[str, str] = {}
+        for batch in self.wait(batch_ids):
+            responses.update(self.results(batch))
+        failed = len(requests) - len(responses)
+        if failed:
+            self._logger.warning(f"{failed} of {len(requests)} batch requests returned no response")
+        return responses
+
+    def submit(self, requests: Dict[str, Dict[str, Any]]) -> str:
+        """Upload a batch file with the given requests and create a batch for it.
+
+        Args:
+            requests: The ``chat.completions.create`` arguments of every request by request id.
+
+        Returns:
+            The id of the created batch.
+        """
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": self.ENDPOINT, "body": body})
+            for custom_id, body in requests.items()
+        ]
+        content = ("\n".join(lines) + "\n").encode("utf-8")
+        input_file = self._client.files.create(file=("batch.jsonl", io.BytesIO(content)), purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window=self.COMPLETION_WINDOW,
+        )
+        self._logger.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    def wait(self, batch_ids: List[str]) -> List[Any]:
+        """Poll batches until all of them have ended.
+
+        Batches still running at the timeout are cancelled and polled for up to CANCEL_GRACE
+        more, since a cancelled batch still returns the requests it completed.
+
+        Args:
+            batch_ids: The ids of the batches.
+
+        Returns:
+            The last known state of every batch, in the order of the ids.
+        """
+        deadline = time.monotonic() + self._timeout.total_seconds() if self._timeout is not None else None
+        cancelled = False
+        batches: Dict[str, Any] = {}
+        ended = set()
+        while True:
+            for batch_id in batch_ids:
+                if batch_id not in ended:
+                    batch = batches[batch_id] = self._client.batches.retrieve(batch_id)
+                    if batch.status in self.FINAL_STATUSES:
+                        self._logger.info(f"Batch {batch_id} ended with status {batch.status}")
+                        ended.add(batch_id)
+            if len(ended) == len(batch_ids):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                running = [batch_id for batch_id in batch_ids if batch_id not in ended]
+                if cancelled:
+                    self._logger.warning(f"Cancelled batches did not end within {self.CANCEL_GRACE}: {running}")
+                    break
+                self._logger.warning(f"Cancelling {len(running)} batches that did not complete within {self._timeout}")
+                for batch_id in running:
+                    try:
+                        self._client.batches.cancel(batch_id)
+                    except openai.OpenAIError as e:
+                        self._logger.warning(f"Failed to cancel batch {batch_id}. Error: {e}")
+                cancelled = True
+                deadline = time.monotonic() + self.CANCEL_GRACE.total_seconds()
+            self._logger.debug(f"Waiting for {len(batch_ids) - len(ended)} batches")
+            time.sleep(self._poll_interval)
+        return [batches[batch_id] for batch_id in batch_ids]
+
+    def results(self, batch: Any) -> Dict[str, str]:
+        """Read the responses of an ended batch.
+
+        Args:
+            batch: The final state of the batch.
+
+        Returns:
+            The response message of every request that succeeded, by request id.
+        """
+        responses: Dict[str, str] = {}
+        if batch.output_file_id:
+            for line in self._client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                response = result.get("response") or {}
+                if result.get("error") or response.get("status_code") != 200:
+                    self._logger.error(
+                        f"Batch request {result.get('custom_id')} failed. Error: {result.get('error') or response}"
+                    )
+                    continue
+                responses[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+        if batch.error_file_id:
+            for line in self._client.files.content(batch.error_file_id).text.splitlines():
+                if line.strip():
+                    result = json.loads(line)
+                    self._logger.error(f"Batch request {result.get('custom_id')} failed. Error: {result.get('error')}")
+        return responses
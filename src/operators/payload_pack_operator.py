@@ -0,0 +1,258 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class PayloadPackOperator:
+    """Stores the payloads of a run in one pack file instead of one file per item.
+
+    ``payloads.pack`` holds the UTF-8 encoded payloads back to back and ``payloads.idx`` one
+    fixed-size entry per payload with its item index, offset and length. Both files are only
+    appended to, so a run can be resumed after an interruption. Packs are read through one
+    memory map per folder and process, so reading a payload only touches its own pages. Each
+    map holds a file descriptor, so only the readers of the most recently read packs are kept.
+    """
+
+    PACK_FILE_NAME = "payloads.pack"
+    INDEX_FILE_NAME = "payloads.idx"
+    # An index entry: item index, offset and length in bytes, little-endian.
+    ENTRY = struct.Struct("<qQQ")
+    # The number of packs kept open per process; the least recently read one is closed first.
+    MAX_READERS = 16
+
+    _readers: "OrderedDict[str, PackReader]" = OrderedDict()
+    _readers_lock = threading.Lock()
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+
+    @classmethod
+    def reader(cls, folder_path: str) -> "PackReader":
+        """Get the reader of the pack of a folder shared by the current process.
+
+        Args:
+            folder_path: The output folder.
+
+        Returns:
+            The reader.
+        """
+        evicted = None
+        with cls._readers_lock:
+            reader = cls._readers.get(folder_path)
+            if reader is None:
+                reader = cls._readers[folder_path] = PackReader(folder_path)
+                if len(cls._readers) > cls.MAX_READERS:
+                    _, evicted = cls._readers.popitem(last=False)
+            else:
+                cls._readers.move_to_end(folder_path)
+        if evicted is not None:
+            evicted.close()
+        return reader
+
+    @classmethod
+    def forget(cls, folder_path: str) -> None:
+        """Drop the shared reader of a folder whose pack is being rewritten or removed.
+
+        Args:
+            folder_path: The output folder.
+        """
+        with cls._readers_lock:
+            reader = cls._readers.pop(folder_path, None)
+        if reader is not None:
+            reader.close()
+
+    def exists(self, folder_path: str) -> bool:
+        return os.path.exists(os.path.join(folder_path, self.PACK_FILE_NAME))
+
+    def open_writer(self, folder_path: str, append: bool = False) -> "PackWriter":
+        """Start the pack of a run that payloads are appended to one at a time.
+
+        Args:
+            folder_path: The output folder.
+            append: Whether to keep the payloads already in the pack, to resume an interrupted run.
+
+        Returns:
+            The writer, which must be closed when the run ends.
+        """
+        if not append:
+            self.forget(folder_path)
+        return PackWriter(
+            os.path.join(folder_path, self.PACK_FILE_NAME), os.path.join(folder_path, self.INDEX_FILE_NAME), append
+        )
+
+    def recover(self, folder_path: str) -> None:
+        """Drop a partly written last index entry of an interrupted run.
+
+        Payload bytes after the last complete entry are left in place; no entry refers to them.
+
+        Args:
+            folder_path: The output folder of the interrupted run.
+        """
+        index_path = os.path.join(folder_path, self.INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return
+        size = os.path.getsize(index_path)
+        valid_size = size - size % self.ENTRY.size
+        if valid_size < size:
+            self._logger.warning(f"Dropping a partly written index entry from {index_path}")
+            with open(index_path, "r+b") as file:
+                file.truncate(valid_size)
+        self.forget(folder_path)
+
+    def remove(self, folder_path: str) -> None:
+        """Delete the pack and index of a folder.
+
+        Args:
+            folder_path: The output folder.
+        """
+        self.forget(folder_path)
+        for file_name in (self.PACK_FILE_NAME, self.INDEX_FILE_NAME):
+            file_path = os.path.join(folder_path, file_name)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+
+class PackWriter:
+    """Appends the payloads of one run to its pack and their entries to its index."""
+
+    def __init__(self, pack_path: str, index_path: str, append: bool = False):
+        mode = "ab" if append else "wb"
+        self._pack = open(pack_path, mode)
+        self._index = open(index_path, mode)
+        self._offset = self._pack.seek(0, os.SEEK_END)
+
+    def __enter__(self) -> "PackWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def append(self, index: int, content: str) -> None:
+        """Write the payload of an item. Its index entry is written once the payload is complete.
+
+        Args:
+            index: The position of the item in the output.
+            content: The payload.
+        """
+        data = content.encode("utf-8")
+        self._pack.write(data)
+        self._pack.flush()
+        self._index.write(PayloadPackOperator.ENTRY.pack(index, self._offset, len(data)))
+        self._index.flush()
+        self._offset += len(data)
+
+    def close(self) -> None:
+        self._pack.close()
+        self._index.close()
+
+
+class PackReader:
+    """Reads payloads from the pack of a folder through a memory map.
+
+    The index is read on first use and again when an item is missing from it, and the pack
+    is mapped again when a payload lies beyond the mapped size, so a pack that is still
+    being written can be read.
+    """
+
+    def __init__(self, folder_path: str):
+        self._pack_path = os.path.join(folder_path, PayloadPackOperator.PACK_FILE_NAME)
+        self._index_path = os.path.join(folder_path, PayloadPackOperator.INDEX_FILE_NAME)
+        self._entries: Dict[int, Tuple[int, int]] = {}
+        self._index_size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """Get the offset and length of the payload of an item.
+
+        Args:
+            index: The position of the item in the output.
+
+        Returns:
+            The offset and length in bytes.
+
+        Raises:
+            KeyError: If the pack holds no payload for the item.
+        """
+        with self._lock:
+            entry = self._entries.get(index)
+            if entry is None:
+                self._read_index()
+                entry = self._entries.get(index)
+        if entry is None:
+            raise KeyError(f"No payload of item {index} in {self._pack_path}")
+        return entry
+
+    def view(self, index: int) -> memoryview:
+        """Get the encoded payload of an item without copying it out of the memory map.
+
+        Args:
+            index: The position of the item in the output.
+
+        Returns:
+            The UTF-8 encoded payload.
+        """
+        offset, length = self.locate(index)
+        if length == 0:
+            return memoryview(b"")
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                # Views of an earlier map keep it open until they are released.
+                with open(self._pack_path, "rb") as file:
+                    self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return memoryview(self._map)[offset:offset + length]
+
+    def read(self, index: int) -> str:
+        """Read the payload of an item.
+
+        Args:
+            index: The position of the item in the output.
+
+        Returns:
+            The payload.
+        """
+        return str(self.view(index), "utf-8")
+
+    def close(self) -> None:
+        """Close the memory map. Views still in use keep it open until they are released."""
+        with self._lock:
+            current, self._map = self._map, None
+        if current is not None:
+            try:
+                current.close()
+            except BufferError:
+                pass
+
+    def _read_index(self) -> None:
+        # Read the entries appended since the last read; the last entry wins for an item written twice.
+        with open(self._index_path, "rb") as file:
+            file.seek(self._index_size)
+            data = file.read()
+        size = len(data) - len(data) % PayloadPackOperator.ENTRY.size
+        for index, offset, length in PayloadPackOperator.ENTRY.iter_unpack(data[:size]):
+            self._entries[index] = (offset, length)
+        self._index_size += size
+
+
+class PackedPayload:
+    """Reference to the payload of an item in the pack of its output folder.
+
+    Items point at it instead of a payload file path; it holds no open file or map, so the
+    items can be pickled for process pool workers.
+    """
+
+    __slots__ = ("folder_path", "index")
+
+    def __init__(self, folder_path: str, index: int):
+        self.folder_path = folder_path
+        self.index = index
+
+    def read(self) -> str:
+        return PayloadPackOperator.reader(self.folder_path).read(self.index)
+
+    def size(self) -> int:
+        return PayloadPackOperator.reader(self.folder_path).locate(self.index)[1]
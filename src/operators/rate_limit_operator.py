@@ -0,0 +1,164 @@
+import logging
+import random
+import re
+import threading
+import time
+from typing import Mapping, Optional
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a rate-limit reset duration such as "20ms", "1s" or "6m0s" into seconds.
+
+    Args:
+        value: The header value, or None.
+
+    Returns:
+        The duration in seconds, or None if the value cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self._capacity = capacity
+        self._refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until ``amount`` tokens are available and take them.
+
+        Args:
+            amount: The number of tokens to take, capped at the bucket capacity.
+        """
+        amount = min(amount, self._capacity)
+        while True:
+            with self._lock:
+                now = self._refill()
+                if now >= self._blocked_until and self._level >= amount:
+                    self._level -= amount
+                    return
+                wait = max(self._blocked_until - now, (amount - self._level) / self._refill_per_second)
+            time.sleep(wait)
+
+    def observe(self, remaining: Optional[float], reset_seconds: Optional[float]) -> None:
+        """Align the bucket with the remaining budget reported by the server.
+
+        Args:
+            remaining: The number of tokens the server says are left, or None.
+            reset_seconds: The number of seconds until the server budget is restored, or None.
+        """
+        with self._lock:
+            now = self._refill()
+            if remaining is not None:
+                self._level = min(self._level, remaining)
+                if remaining <= 0 and reset_seconds:
+                    self._blocked_until = max(self._blocked_until, now + reset_seconds)
+
+    def pause(self, seconds: float) -> None:
+        """Refuse all acquisitions for the given number of seconds.
+
+        Args:
+            seconds: The length of the pause.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._level = min(self._capacity, self._level + (now - self._updated_at) * self._refill_per_second)
+        self._updated_at = now
+        return now
+
+
+class RateLimitOperator:
+    """Schedules API calls within requests-per-minute and tokens-per-minute budgets.
+
+    Budgets adapt to the ``x-ratelimit-*`` headers returned by the API, and a rejected call
+    pauses every caller sharing the limiter for a jittered exponential backoff.
+    """
+
+    def __init__(
+            self,
+            requests_per_minute: float = 500,
+            tokens_per_minute: float = 200000,
+            base_delay: float = 1.0,
+            max_delay: float = 60.0,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: The request budget per minute.
+            tokens_per_minute: The token budget per minute.
+            base_delay: The backoff delay in seconds after the first failure.
+            max_delay: The upper bound of the backoff delay in seconds.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+    def acquire(self, tokens: float) -> None:
+        """Block until one request using ``tokens`` tokens fits in both budgets.
+
+        Args:
+            tokens: The estimated number of tokens the request consumes.
+        """
+        self._requests.acquire(1)
+        self._tokens.acquire(tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Adapt the budgets to the rate-limit headers of an API response.
+
+        Args:
+            headers: The response headers.
+        """
+        self._requests.observe(
+            self._to_float(headers.get("x-ratelimit-remaining-requests")),
+            parse_duration(headers.get("x-ratelimit-reset-requests")),
+        )
+        self._tokens.observe(
+            self._to_float(headers.get("x-ratelimit-remaining-tokens")),
+            parse_duration(headers.get("x-ratelimit-reset-tokens")),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Pause all callers after a rejected or failed call.
+
+        Args:
+            attempt: The zero-based number of the attempt that failed.
+            retry_after: The value of the Retry-After header, if any.
+
+        Returns:
+            The pause in seconds.
+        """
+        delay = min(self._max_delay, self._base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        server_delay = parse_duration(retry_after)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        self._requests.pause(delay)
+        return delay
+
+    @staticmethod
+    def _to_float(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
@@ -0,0 +1,249 @@
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Iterator, Optional
+
+from datatypes.base_type import BaseType
+from operators.codec_operator import CodecOperator
+from operators.payload_pack_operator import PackedPayload, PackWriter, PayloadPackOperator
+
+
+class RecordOperator:
+    """Reads and writes a node's output records as JSON Lines.
+
+    Every item becomes one line of ``records.jsonl``. The item's payload field (the HTML of
+    a page, the body of a markdown document, ...) is not embedded in the record but written
+    to ``payload_{index}.{extension}`` and referenced by ``file_name``, so it is only read
+    back when it is accessed. Runs with many items can append the payloads to a single pack
+    file instead (see ``PayloadPackOperator``); their records are marked ``packed`` and keep
+    the ``file_name`` the payload gets when it is exported to a loose file. Records are
+    encoded with the shared ``CodecOperator``. Folders
+    written before this format with a monolithic ``all.json`` can still be read, one record
+    at a time.
+    """
+
+    FILE_NAME = "records.jsonl"
+    LEGACY_FILE_NAME = "all.json"
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._codec = CodecOperator.shared()
+        self._pack_operator = PayloadPackOperator()
+
+    def open_writer(self, folder_path: str, append: bool = False, pack: bool = False) -> "RecordWriter":
+        """Start a record file that items are appended to one at a time.
+
+        Args:
+            folder_path: The output folder.
+            append: Whether to keep the records already in the file, to resume an interrupted run.
+            pack: Whether to append the payloads to the pack of the folder instead of writing payload files.
+
+        Returns:
+            The writer, which must be closed when the run ends.
+        """
+        pack_writer = self._pack_operator.open_writer(folder_path, append) if pack else None
+        return RecordWriter(folder_path, os.path.join(folder_path, self.FILE_NAME), append, pack_writer)
+
+    def recover(self, folder_path: str) -> Dict[int, dict]:
+        """Read the records an interrupted run completed, dropping a partly written last record.
+
+        Every record is flushed after its payload file is complete, so every complete line
+        stands for a finished item. A line cut off by the interruption is truncated from the
+        file so new records can be appended after the last complete one.
+
+        Args:
+            folder_path: The output folder of the interrupted run.
+
+        Returns:
+            The completed records by item index.
+        """
+        file_path = os.path.join(folder_path, self.FILE_NAME)
+        records: Dict[int, dict] = {}
+        self._pack_operator.recover(folder_path)
+        if not os.path.exists(file_path):
+            return records
+        valid_size = 0
+        with open(file_path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = self._codec.loads(line)
+                except ValueError:
+                    break
+                records[record["index"]] = record
+                valid_size += len(line)
+        if valid_size < os.path.getsize(file_path):
+            self._logger.warning(f"Dropping a partly written record from {file_path}")
+            with open(file_path, "r+b") as file:
+                file.truncate(valid_size)
+        return records
+
+    def sort(self, folder_path: str) -> None:
+        """Rewrite the record file of a folder in item order, after a resumed run appended to it.
+
+        Args:
+            folder_path: The output folder.
+        """
+        file_path = os.path.join(folder_path, self.FILE_NAME)
+        with open(file_path, "rb") as file:
+            lines = [line for line in file if line.strip()]
+        lines.sort(key=lambda line: self._codec.loads(line)["index"])
+        file_descriptor, temp_path = tempfile.mkstemp(dir=folder_path, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.writelines(lines)
+            os.replace(temp_path, file_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    @staticmethod
+    def to_record(folder_path: str, index: int, item: BaseType, pack: Optional[PackWriter] = None) -> dict:
+        """Write the payload of an item to its payload file or the pack and build its record.
+
+        Args:
+            folder_path: The output folder.
+            index: The position of the item in the output.
+            item: The item.
+            pack: The pack of the run, if payloads are packed.
+
+        Returns:
+            The record to store for the item.
+        """
+        record = item.to_dict()
+        record["index"] = index
+        if item.PAYLOAD_FIELD:
+            file_name = f"payload_{index}.{item.PAYLOAD_EXTENSION}"
+            file_path = os.path.join(folder_path, file_name)
+            if pack is None:
+                item.save_payload(file_path, record.pop(item.PAYLOAD_FIELD))
+            else:
+                pack.append(index, record.pop(item.PAYLOAD_FIELD))
+                record["packed"] = True
+                if os.path.exists(file_path):
+                    # A payload streamed to its file while it was generated now lives in the pack.
+                    os.remove(file_path)
+            record["file_name"] = file_name
+        return record
+
+    def exists(self, folder_path: str) -> bool:
+        """Check whether a folder contains records in either format.
+
+        Args:
+            folder_path: The folder to check.
+
+        Returns:
+            True if records can be read from the folder.
+        """
+        return any(
+            os.path.exists(os.path.join(folder_path, file_name))
+            for file_name in (self.FILE_NAME, self.LEGACY_FILE_NAME)
+        )
+
+    def iter_records(self, folder_path: str) -> Iterator[dict]:
+        """Yield the records of a folder one at a time.
+
+        Args:
+            folder_path: The folder to read.
+
+        Yields:
+            The raw records, in output order.
+        """
+        file_path = os.path.join(folder_path, self.FILE_NAME)
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as file:
+                for line in file:
+                    if line.strip():
+                        yield self._codec.loads(line)
+        else:
+            with open(os.path.join(folder_path, self.LEGACY_FILE_NAME), "rb") as file:
+                yield from self._codec.iter_array(file)
+
+    @staticmethod
+    def attach_payload(folder_path: str, record: dict, item: Optional[Any]) -> None:
+        """Point a loaded item at its payload file or packed payload unless the record embeds the payload.
+
+        Args:
+            folder_path: The folder the record was read from.
+            record: The raw record.
+            item: The item loaded from the record.
+        """
+        if not isinstance(item, BaseType) or not item.PAYLOAD_FIELD or "file_name" not in record:
+            return
+        if item.PAYLOAD_FIELD in record:
+            return
+        if record.get("packed"):
+            item.set_payload_path(PackedPayload(folder_path, record["index"]))
+        else:
+            item.set_payload_path(os.path.join(folder_path, record["file_name"]))
+
+    def export_payloads(self, folder_path: str) -> int:
+        """Write the packed payloads of a folder to payload files and remove its pack.
+
+        The records are rewritten to refer to the payload files, which gives the folder the
+        same layout as a run without a pack.
+
+        Args:
+            folder_path: The output folder.
+
+        Returns:
+            The number of exported payloads.
+        """
+        reader = PayloadPackOperator.reader(folder_path)
+        file_path = os.path.join(folder_path, self.FILE_NAME)
+        exported = 0
+        file_descriptor, temp_path = tempfile.mkstemp(dir=folder_path, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                for record in self.iter_records(folder_path):
+                    if record.pop("packed", False):
+                        with open(os.path.join(folder_path, record["file_name"]), "wb") as payload_file:
+                            payload_file.write(reader.view(record["index"]))
+                        exported += 1
+                    file.write(self._codec.dumps(record) + b"\n")
+            os.replace(temp_path, file_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        self._pack_operator.remove(folder_path)
+        self._logger.info(f"Exported {exported} payloads of {folder_path} to payload files")
+        return exported
+
+
+class RecordWriter:
+    """Appends the records of one run to its record file as the items complete."""
+
+    def __init__(self, folder_path: str, file_path: str, append: bool = False, pack: Optional[PackWriter] = None):
+        self._folder_path = folder_path
+        self._pack = pack
+        self._codec = CodecOperator.shared()
+        self._file = open(file_path, "ab" if append else "wb")
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def append(self, index: int, item: Optional[BaseType]) -> Optional[dict]:
+        """Write the payload and record of an item, skipping failed (None) items.
+
+        Args:
+            index: The position of the item in the output.
+            item: The processed item.
+
+        Returns:
+            The written record, or None if the item was skipped.
+        """
+        if item is None:
+            return None
+        record = RecordOperator.to_record(self._folder_path, index, item, self._pack)
+        self._file.write(self._codec.dumps(record) + b"\n")
+        self._file.flush()
+        return record
+
+    def close(self) -> None:
+        self._file.close()
+        if self._pack is not None:
+            self._pack.close()
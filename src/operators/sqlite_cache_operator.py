@@ -0,0 +1,138 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+
+class SqliteCacheOperator:
+    """Base of the persistent caches that keep their entries in a SQLite file.
+
+    A subclass declares the table its entries live in, which has at least the columns
+    ``key``, ``size``, ``created_at`` and ``accessed_at``, and reads and writes the entries.
+    The base opens the connections, expires entries after ``cache_duration`` and evicts the
+    least recently used ones once the stored entries exceed ``max_bytes``. The database is
+    safe to use from several threads and processes at the same time.
+    """
+
+    # The table of the entries and the statements that create the schema.
+    TABLE = ""
+    SCHEMA: tuple = ()
+    # The name of the cache in log messages.
+    DESCRIPTION = "cache"
+    # The default size limit, overridable with the environment variable of the subclass.
+    DEFAULT_MAX_MEGABYTES = 1024
+    MAX_MEGABYTES_VARIABLE = ""
+    # The size limit is enforced after every this many writes.
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, database_path: str, cache_duration: Optional[timedelta], max_bytes: Optional[int] = None):
+        """Initialize the cache, creating the database on first use.
+
+        Args:
+            database_path: The SQLite file.
+            cache_duration: How long an entry stays valid, or None if it never expires.
+            max_bytes: The maximum total size of the stored entries, defaults to the megabytes
+                in MAX_MEGABYTES_VARIABLE or DEFAULT_MAX_MEGABYTES.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._database_path = database_path
+        self._cache_duration = cache_duration
+        if max_bytes is None:
+            megabytes = os.getenv(self.MAX_MEGABYTES_VARIABLE) if self.MAX_MEGABYTES_VARIABLE else None
+            max_bytes = int(megabytes or self.DEFAULT_MAX_MEGABYTES) * 1024 * 1024
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __getstate__(self) -> dict:
+        # Process pool workers open their own connections.
+        state = self.__dict__.copy()
+        del state["_local"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def evict(self) -> int:
+        """Delete expired entries, then the least recently used ones until the size limit holds.
+
+        Returns:
+            The number of deleted entries.
+        """
+        try:
+            connection = self._connect()
+            deleted = 0
+            if self._cache_duration is not None:
+                cutoff = time.time() - self._cache_duration.total_seconds()
+                deleted += connection.execute(f"DELETE FROM {self.TABLE} WHERE created_at < ?", (cutoff,)).rowcount
+            total = connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+            if total > self._max_bytes:
+                excess = total - self._max_bytes
+                rows = connection.execute(f"SELECT key, size FROM {self.TABLE} ORDER BY accessed_at")
+                keys = []
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    keys.append((key,))
+                    excess -= size
+                connection.executemany(f"DELETE FROM {self.TABLE} WHERE key = ?", keys)
+                deleted += len(keys)
+            self._after_evict(connection)
+            if deleted:
+                self._logger.info(f"Evicted {deleted} entries from the {self.DESCRIPTION} {self._database_path}")
+            return deleted
+        except sqlite3.Error as e:
+            self._logger.warning(f"Eviction from the {self.DESCRIPTION} failed. Error: {e}")
+            return 0
+
+    def _after_evict(self, connection: sqlite3.Connection) -> None:
+        # Subclasses delete what the deleted entries referred to.
+        pass
+
+    def _touch(self, connection: sqlite3.Connection, key: str, created_at: float, now: float) -> bool:
+        """Mark an entry as used now, or delete it if it has expired.
+
+        Args:
+            connection: The connection of the current thread.
+            key: The key of the entry.
+            created_at: When the entry was stored.
+            now: The current time.
+
+        Returns:
+            Whether the entry is still valid.
+        """
+        if self._cache_duration is not None and now - created_at > self._cache_duration.total_seconds():
+            connection.execute(f"DELETE FROM {self.TABLE} WHERE key = ?", (key,))
+            return False
+        connection.execute(f"UPDATE {self.TABLE} SET accessed_at = ? WHERE key = ?", (now, key))
+        return True
+
+    def _stored(self) -> None:
+        # Count a write and enforce the size limit every EVICTION_INTERVAL writes.
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICTION_INTERVAL == 0
+        if evict:
+            self.evict()
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared between threads, so every thread opens its own.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            folder = os.path.dirname(self._database_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            connection = sqlite3.connect(self._database_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            self._local.connection = connection
+        return connection
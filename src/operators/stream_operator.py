@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+from typing import Any, Iterable, Iterator, List
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamOperator:
+    """Connects lazily evaluated stages through bounded queues.
+
+    A buffered stream runs its producer in a background thread that stays at most
+    ``maxsize`` items ahead of the consumer, so consecutive stages overlap while a slow
+    consumer holds back its producer instead of letting items pile up in memory.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    @staticmethod
+    def buffered(items: Iterable[Any], maxsize: int) -> Iterator[Any]:
+        """Iterate ``items`` in a background thread through a bounded queue.
+
+        The producer thread starts on the first ``next()`` and stops when the consumer
+        closes the iterator. Exceptions raised by the producer are re-raised in the consumer.
+
+        Args:
+            items: The items to produce.
+            maxsize: The maximum number of items waiting to be consumed.
+
+        Yields:
+            The items, in order.
+        """
+        return StreamOperator.tee(items, 1, maxsize)[0]
+
+    @staticmethod
+    def tee(items: Iterable[Any], count: int, maxsize: int) -> List[Iterator[Any]]:
+        """Split ``items`` into ``count`` independent buffered iterators.
+
+        Every item is delivered to every branch. The branches must be consumed concurrently:
+        a branch that is not read holds back the shared producer once its queue is full.
+
+        Args:
+            items: The items to produce.
+            count: The number of branches.
+            maxsize: The maximum number of items waiting in each branch.
+
+        Returns:
+            The branches.
+        """
+        queues = [queue.Queue(maxsize=max(1, maxsize)) for _ in range(count)]
+        stopped = [threading.Event() for _ in range(count)]
+        started = threading.Event()
+        lock = threading.Lock()
+
+        def put(index: int, value: Any) -> None:
+            while not stopped[index].is_set():
+                try:
+                    queues[index].put(value, timeout=StreamOperator.POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            iterator = iter(items)
+            try:
+                for item in iterator:
+                    if all(event.is_set() for event in stopped):
+                        break
+                    for index in range(count):
+                        put(index, item)
+                final = _DONE
+            except BaseException as e:
+                final = _Failure(e)
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+            for index in range(count):
+                put(index, final)
+
+        def start() -> None:
+            with lock:
+                if not started.is_set():
+                    started.set()
+                    threading.Thread(target=produce, daemon=True).start()
+
+        def consume(index: int) -> Iterator[Any]:
+            start()
+            try:
+                while True:
+                    value = queues[index].get()
+                    if value is _DONE:
+                        return
+                    if isinstance(value, _Failure):
+                        raise value.error
+                    yield value
+            finally:
+                stopped[index].set()
+
+        return [consume(index) for index in range(count)]
+
+    @staticmethod
+    def drain(streams: Iterable[Iterable[Any]]) -> List[int]:
+        """Consume several streams concurrently until all of them are exhausted.
+
+        Args:
+            streams: The streams to consume.
+
+        Returns:
+            The number of items consumed from each stream.
+
+        Raises:
+            Exception: The first exception raised by any of the streams.
+        """
+        streams = list(streams)
+        counts = [0] * len(streams)
+        errors: List[BaseException] = []
+
+        def consume(index: int) -> None:
+            try:
+                for _ in streams[index]:
+                    counts[index] += 1
+            except BaseException as e:
+                logging.getLogger(__name__).error(f"Stream {index} failed. Error: {e}")
+                errors.append(e)
+
+        threads = [threading.Thread(target=consume, args=(index,), daemon=True) for index in range(len(streams))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return counts
@@ -0,0 +1,164 @@
+import math
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base" if model.startswith(("gpt-4o", "o1", "o3", "o4")) else "cl100k_base")
+
+
+class TokenOperator:
+    """Counts and splits text in the tokens of a model.
+
+    Counts are exact when ``tiktoken`` is installed. Otherwise they are estimated on the high
+    side, since markup and URLs take fewer characters per token than prose and a prompt that is
+    underestimated is rejected for exceeding the context window. The operator also knows the
+    context window of the common models.
+    """
+
+    # The estimate without tiktoken: characters per token, plus a margin on the resulting count.
+    CHARACTERS_PER_TOKEN = 3
+    ESTIMATE_MARGIN = 1.1
+    # Context windows by model name prefix; the longest matching prefix wins.
+    CONTEXT_WINDOWS = {
+        "gpt-3.5-turbo": 16385,
+        "gpt-4": 8192,
+        "gpt-4-32k": 32768,
+        "gpt-4-turbo": 128000,
+        "gpt-4o": 128000,
+        "gpt-4.1": 1047576,
+        "o1": 200000,
+        "o3": 200000,
+        "o4": 200000,
+    }
+    DEFAULT_CONTEXT_WINDOW = 16385
+    # Completion tokens a single request may ask for, by model name prefix.
+    MAX_OUTPUT_TOKENS = {
+        "gpt-3.5-turbo": 4096,
+        "gpt-4": 8192,
+        "gpt-4-turbo": 4096,
+        "gpt-4o": 16384,
+        "gpt-4.1": 32768,
+        "o1": 100000,
+        "o3": 100000,
+        "o4": 100000,
+    }
+    DEFAULT_MAX_OUTPUT_TOKENS = 4096
+    # Tokens a chat message takes besides its content.
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, model: str):
+        """Initialize the operator for a model.
+
+        Args:
+            model: The model name, such as "gpt-4o-mini".
+        """
+        self.model = model
+        self._encoding = _get_encoding(model) if tiktoken is not None else None
+
+    @property
+    def context_window(self) -> int:
+        """The number of tokens the prompt and the completion of a request may take together."""
+        return self._lookup(self.CONTEXT_WINDOWS, self.DEFAULT_CONTEXT_WINDOW)
+
+    @property
+    def max_output_tokens(self) -> int:
+        """The number of completion tokens a request may ask for."""
+        return self._lookup(self.MAX_OUTPUT_TOKENS, self.DEFAULT_MAX_OUTPUT_TOKENS)
+
+    def _lookup(self, limits: dict, default: int) -> int:
+        prefixes = [prefix for prefix in limits if self.model.startswith(prefix)]
+        if not prefixes:
+            return default
+        return limits[max(prefixes, key=len)]
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text.
+
+        Args:
+            text: The text.
+
+        Returns:
+            The number of tokens.
+        """
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) * self.ESTIMATE_MARGIN / self.CHARACTERS_PER_TOKEN)
+
+    def count_messages(self, messages: List[dict]) -> int:
+        """Count the prompt tokens of chat messages.
+
+        Args:
+            messages: The chat messages.
+
+        Returns:
+            The number of tokens.
+        """
+        return sum(self.count(message["content"]) + self.MESSAGE_OVERHEAD for message in messages)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Split a text into chunks of at most max_tokens tokens.
+
+        Chunks end at paragraph boundaries where possible, then at line boundaries, and only
+        paragraphs too long by themselves are cut in the middle.
+
+        Args:
+            text: The text.
+            max_tokens: The maximum number of tokens of a chunk.
+
+        Returns:
+            The chunks, in order.
+
+        Raises:
+            ValueError: If max_tokens is not positive.
+        """
+        if max_tokens <= 0:
+            raise ValueError(f"Cannot split text into chunks of {max_tokens} tokens.")
+        chunks: List[str] = []
+        self._split(text, max_tokens, ("\n\n", "\n"), chunks)
+        return chunks
+
+    def _split(self, text: str, max_tokens: int, separators: tuple, chunks: List[str]) -> None:
+        if self.count(text) <= max_tokens:
+            chunks.append(text)
+            return
+        if not separators:
+            chunks.extend(self._cut(text, max_tokens))
+            return
+
+        # Parts are counted once each; a join costs the tokens of the separator.
+        separator = separators[0]
+        separator_tokens = self.count(separator)
+        current: List[str] = []
+        current_tokens = 0
+        for part in text.split(separator):
+            part_tokens = self.count(part)
+            if current and current_tokens + separator_tokens + part_tokens <= max_tokens:
+                current.append(part)
+                current_tokens += separator_tokens + part_tokens
+                continue
+            if current:
+                chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+            if part_tokens <= max_tokens:
+                current, current_tokens = [part], part_tokens
+            else:
+                self._split(part, max_tokens, separators[1:], chunks)
+        if current:
+            chunks.append(separator.join(current))
+
+    def _cut(self, text: str, max_tokens: int) -> List[str]:
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return [self._encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+        size = max(1, int(max_tokens * self.CHARACTERS_PER_TOKEN / self.ESTIMATE_MARGIN))
+        return [text[i:i + size] for i in range(0, len(text), size)]
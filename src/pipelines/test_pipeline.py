@@ -1,12 +1,40 @@
 import argparse
 import logging
 
+from datatypes.url_type import Url
 from nodes.amazon_product_parser_node import AmazonProductParserNode
 from nodes.browser_node import BrowserNode
 from nodes.markdown_node import MarkdownNode
 from nodes.openai_node import OpenAINode
+from operators.dag_operator import DagOperator
+from operators.stream_operator import StreamOperator
 from pipelines.base_pipeline import BasePipeline
 
+OPENAI_PARAMETERS = {
+    "model": "gpt-3.5-turbo",
+    "temperature": 0.5,
+    "max_tokens": 2000,
+    "top_p": 1.0,
+    "frequency_penalty": 0.0,
+    "presence_penalty": 0.0,
+}
+
+BLOG_STAGE = {
+    "node_name": "openai_blog",
+    "system_prompt": "You are a blog writer who needs to write a blog post about the product.",
+    "user_prompt": "Write a blog post about the product.",
+    "openai_parameters": OPENAI_PARAMETERS,
+    # Long posts are written to their payload files as they are generated.
+    "stream": True,
+}
+
+PPC_KEYWORDS_STAGE = {
+    "node_name": "openai_ppc_keywords",
+    "system_prompt": "You are a PPC specialist.",
+    "user_prompt": "Look at this product and extract the 10 most relevant keywords for PPC campaigns. Your output must be lowercase, each keyword on a new line. No numbers or special characters.",
+    "openai_parameters": OPENAI_PARAMETERS,
+}
+
 
 class TestPipeline(BasePipeline):
     """Pipeline for testing purposes."""
@@ -21,6 +49,7 @@ class TestPipeline(BasePipeline):
         self.browser_node = BrowserNode(project_name)
         self.markdown_node = MarkdownNode(project_name)
         self.amazon_product_parser_node = AmazonProductParserNode(project_name)
+        # One node, client and rate limit budget is shared by both LLM stages, which run at the same time.
         self.openai_node = OpenAINode(project_name)
 
     def add_arguments(self, parser: argparse.ArgumentParser) -> None:
@@ -31,6 +60,9 @@ class TestPipeline(BasePipeline):
         """
         parser.add_argument("--input_data_dir", type=str, help="CSV file with URLs to fetch HTML from")
         parser.add_argument("--url", type=str, help="URL for fetching HTML")
+        parser.add_argument(
+            "--stream", action="store_true", help="Overlap all stages instead of running each one to completion"
+        )
 
     def execute(self, args: argparse.Namespace) -> None:
         """Execute the pipeline.
@@ -43,50 +75,65 @@ class TestPipeline(BasePipeline):
         """
         try:
             if args.input_data_dir:
-                html_dir = self.browser_node.get_path(
-                    input_path=args.input_data_dir, execute_js=True, node_name="get_html"
-                )
+                source = {"input_path": args.input_data_dir}
             elif args.url:
-                html_dir = self.browser_node.get_path(input_data=[args.url], execute_js=True, node_name="get_html")
+                source = {"input_data": [Url(args.url)]}
             else:
                 raise ValueError("Either --input_data_dir or --url must be provided.")
 
-            markdown_dir = self.markdown_node.get_path(input_path=html_dir, node_name="get_markdown")
-            amazon_dir = self.amazon_product_parser_node.get_path(input_path=html_dir, node_name="parse_amazon")
-
-            system_prompt = "You are a blog writer who needs to write a blog post about the product."
-            user_prompt = "Write a blog post about the product."
-            openai_blog_dir = self.openai_node.get_path(
-                input_path=markdown_dir,
-                node_name="openai_blog",
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                openai_parameters={
-                    "model": "gpt-3.5-turbo",
-                    "temperature": 0.5,
-                    "max_tokens": 2000,
-                    "top_p": 1.0,
-                    "frequency_penalty": 0.0,
-                    "presence_penalty": 0.0,
-                },
-            )
-
-            system_prompt = "You are a PPC specialist."
-            user_prompt = "Look at this product and extract the 10 most relevant keywords for PPC campaigns. Your output must be lowercase, each keyword on a new line. No numbers or special characters."
-            openai_keywords_dir = self.openai_node.get_path(
-                input_path=markdown_dir,
-                node_name="openai_ppc_keywords",
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                openai_parameters={
-                    "model": "gpt-3.5-turbo",
-                    "temperature": 0.5,
-                    "max_tokens": 2000,
-                    "top_p": 1.0,
-                    "frequency_penalty": 0.0,
-                    "presence_penalty": 0.0,
-                },
-            )
+            if args.stream:
+                self._execute_streaming(source)
+            else:
+                self._execute_batch(source)
         except Exception as e:
             logging.error(f"An error occurred during pipeline execution: {str(e)}")
             raise
+        finally:
+            self.browser_node.close()
+
+    def _execute_batch(self, source: dict) -> None:
+        """Run each node to completion, starting independent nodes at the same time.
+
+        Args:
+            source: The input_path or input_data of the browser node.
+        """
+        dag = DagOperator()
+        dag.add("get_html", lambda: self.browser_node.get_path(**source, execute_js=True, node_name="get_html"))
+        dag.add(
+            "get_markdown",
+            lambda html_dir: self.markdown_node.get_path(input_path=html_dir, node_name="get_markdown"),
+            depends_on=["get_html"],
+        )
+        dag.add(
+            "parse_amazon",
+            lambda html_dir: self.amazon_product_parser_node.get_path(input_path=html_dir, node_name="parse_amazon"),
+            depends_on=["get_html"],
+        )
+        dag.add(
+            "openai_blog",
+            lambda markdown_dir: self.openai_node.get_path(input_path=markdown_dir, **BLOG_STAGE),
+            depends_on=["get_markdown"],
+        )
+        dag.add(
+            "openai_ppc_keywords",
+            lambda markdown_dir: self.openai_node.get_path(input_path=markdown_dir, **PPC_KEYWORDS_STAGE),
+            depends_on=["get_markdown"],
+        )
+        dag.run()
+
+    def _execute_streaming(self, source: dict) -> None:
+        """Run all nodes at the same time, passing items through bounded queues.
+
+        Args:
+            source: The input_path or input_data of the browser node.
+        """
+        pages = self.browser_node.iter_data(**source, execute_js=True, node_name="get_html")
+        pages_for_markdown, pages_for_amazon = pages.split(2)
+
+        markdowns = self.markdown_node.iter_data(input_data=pages_for_markdown, node_name="get_markdown")
+        products = self.amazon_product_parser_node.iter_data(input_data=pages_for_amazon, node_name="parse_amazon")
+        markdowns_for_blog, markdowns_for_keywords = markdowns.split(2)
+
+        blogs = self.openai_node.iter_data(input_data=markdowns_for_blog, **BLOG_STAGE)
+        keywords = self.openai_node.iter_data(input_data=markdowns_for_keywords, **PPC_KEYWORDS_STAGE)
+        StreamOperator.drain([products, blogs, keywords])
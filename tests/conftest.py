@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# Modules are imported relative to src, as when running main.py from there.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from openai_stand_in import OpenAIStandIn  # noqa: E402
+
+
+@pytest.fixture
+def openai_stand_in(monkeypatch: pytest.MonkeyPatch, tmp_path: str) -> OpenAIStandIn:
+    """A local stand-in of the OpenAI API that new clients talk to, with the node data in a temporary folder."""
+    stand_in = OpenAIStandIn()
+    monkeypatch.setenv("OPENAI_BASE_URL", stand_in.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "stand-in")
+    monkeypatch.setenv("PROJECT_DATA_ROOT_PATH", str(tmp_path))
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    yield stand_in
+    stand_in.close()
@@ -0,0 +1,171 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class OpenAIStandIn:
+    """Local stand-in for the chat completion, file and batch endpoints of the OpenAI API.
+
+    A prompt is answered with the last three characters of its content, prefixed with "S:"
+    for synchronous calls and "B:" for batch requests, so a test can tell which path answered
+    it. Packed prompts get a JSON object with the answer to every item. Batch requests whose
+    content contains "FAIL" fail and those containing "MISSING" are left out of the output,
+    which lists the results in reverse order. Synchronous calls can be scripted to be rejected
+    and to report rate limit headers.
+    """
+
+    def __init__(self):
+        # The number of polls after which a batch completes, or None if batches only end when cancelled.
+        self.polls_to_complete: Optional[int] = 2
+        # The number of requests a cancelled batch reports as completed.
+        self.completed_before_cancel = 0
+        self.files: Dict[str, str] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.chat_requests: List[dict] = []
+        self.chat_times: List[float] = []
+        # The status and headers of the next synchronous calls, then 200 with chat_headers.
+        self.chat_script: List[Tuple[int, Dict[str, str]]] = []
+        self.chat_headers: Dict[str, str] = {}
+        self.cancelled: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def batch_requests(self) -> List[dict]:
+        """Get the requests of every submitted batch, in submission order."""
+        lines = [line for batch in self.batches.values() for line in self.files[batch["input_file_id"]].splitlines()]
+        return [json.loads(line) for line in lines if line]
+
+    @staticmethod
+    def answer(body: dict, prefix: str) -> str:
+        content = body["messages"][-1]["content"]
+        if body.get("response_format", {}).get("type") == "json_object":
+            items = re.findall(r"Item (\d+):\n(.*?)(?=\n\nItem \d+:|$)", content, re.S)
+            return json.dumps({number: f"P:{item[-3:]}" for number, item in items})
+        return f"{prefix}:{content[-3:]}"
+
+    @staticmethod
+    def completion(content: str) -> dict:
+        return {
+            "id": "chatcmpl-stand-in",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "stand-in",
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+            ],
+        }
+
+    def _batch_state(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": batch["status"],
+            "created_at": 0,
+            "output_file_id": batch["output_file_id"],
+            "error_file_id": None,
+        }
+
+    def _end_batch(self, batch_id: str, status: str) -> None:
+        batch = self.batches[batch_id]
+        requests = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines() if line]
+        if status == "cancelled":
+            requests = requests[:self.completed_before_cancel]
+        results = []
+        for request in requests:
+            content = request["body"]["messages"][-1]["content"]
+            if "MISSING" in content:
+                continue
+            if "FAIL" in content:
+                response = {"status_code": 500, "body": {"error": {"message": "failed"}}}
+            else:
+                response = {"status_code": 200, "body": self.completion(self.answer(request["body"], "B"))}
+            results.append({"custom_id": request["custom_id"], "response": response, "error": None})
+        output_file_id = f"file-{len(self.files)}"
+        self.files[output_file_id] = "".join(json.dumps(result) + "\n" for result in reversed(results))
+        batch.update(status=status, output_file_id=output_file_id)
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+                data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                data = self.rfile.read(int(self.headers.get("content-length", 0)))
+                with stand_in._lock:
+                    if self.path == "/v1/chat/completions":
+                        body = json.loads(data)
+                        stand_in.chat_requests.append(body)
+                        stand_in.chat_times.append(time.monotonic())
+                        status, headers = stand_in.chat_script.pop(0) if stand_in.chat_script else (200, {})
+                        if status != 200:
+                            error = {"error": {"message": "Rejected by the stand-in", "type": "requests"}}
+                            return self._send(status, error, headers)
+                        headers = dict(stand_in.chat_headers, **headers)
+                        return self._send(200, stand_in.completion(stand_in.answer(body, "S")), headers)
+                    if self.path == "/v1/files":
+                        match = re.search(rb'filename="[^"]*"\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', data, re.S)
+                        file_id = f"file-{len(stand_in.files)}"
+                        stand_in.files[file_id] = match.group(1).decode("utf-8")
+                        return self._send(200, {
+                            "id": file_id, "object": "file", "bytes": len(match.group(1)), "created_at": 0,
+                            "filename": "batch.jsonl", "purpose": "batch", "status": "processed",
+                        })
+                    if self.path == "/v1/batches":
+                        batch_id = f"batch-{len(stand_in.batches)}"
+                        stand_in.batches[batch_id] = {
+                            "input_file_id": json.loads(data)["input_file_id"], "status": "validating",
+                            "output_file_id": None, "polls": 0,
+                        }
+                        return self._send(200, stand_in._batch_state(batch_id))
+                    match = re.fullmatch(r"/v1/batches/([^/]+)/cancel", self.path)
+                    if match:
+                        stand_in.cancelled.append(match.group(1))
+                        stand_in.batches[match.group(1)]["status"] = "cancelling"
+                        return self._send(200, stand_in._batch_state(match.group(1)))
+                self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+            def do_GET(self) -> None:
+                with stand_in._lock:
+                    match = re.fullmatch(r"/v1/batches/([^/]+)", self.path)
+                    if match:
+                        batch_id = match.group(1)
+                        batch = stand_in.batches[batch_id]
+                        batch["polls"] += 1
+                        if batch["status"] == "cancelling":
+                            stand_in._end_batch(batch_id, "cancelled")
+                        elif batch["status"] in ("validating", "in_progress"):
+                            batch["status"] = "in_progress"
+                            if stand_in.polls_to_complete is not None and batch["polls"] >= stand_in.polls_to_complete:
+                                stand_in._end_batch(batch_id, "completed")
+                        return self._send(200, stand_in._batch_state(batch_id))
+                    match = re.fullmatch(r"/v1/files/([^/]+)/content", self.path)
+                    if match:
+                        return self._send(200, stand_in.files[match.group(1)].encode("utf-8"))
+                self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+        return Handler
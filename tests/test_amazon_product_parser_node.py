@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from datatypes.page_type import Page
+from nodes.amazon_product_parser_node import AmazonProductParserNode
+from nodes.base_node import NodeContext
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "amazon_product.html")
+ADDRESS = "https://www.amazon.com/Acme-Stainless-Steel-Water-Bottle/dp/B0ACME0001/ref=sr_1_1"
+
+
+@pytest.fixture
+def page() -> Page:
+    with open(FIXTURE_PATH, "r", encoding="utf-8") as file:
+        page = Page(address=ADDRESS)
+        page.html = file.read()
+    return page
+
+
+def _process(page: Page, extraction: str, html_parser: str) -> dict:
+    node = AmazonProductParserNode("test")
+    context = NodeContext("AmazonProductParserNode", {"extraction": extraction, "html_parser": html_parser})
+    product = node._process_item(page, context)
+    assert product is not None
+    return product.to_dict()
+
+
+@pytest.mark.parametrize("html_parser", ["lxml", "html.parser"])
+def test_partial_extraction_matches_full_extraction(page: Page, html_parser: str) -> None:
+    assert _process(page, "partial", html_parser) == _process(page, "full", html_parser)
+
+
+@pytest.mark.parametrize("html_parser", ["lxml", "html.parser"])
+def test_partial_extraction_reads_every_field(page: Page, html_parser: str) -> None:
+    product = _process(page, "partial", html_parser)
+
+    assert product["asin"] == "B0ACME0001"
+    assert product["title"] == "Acme Stainless Steel Water Bottle, 32 oz – Vacuum Insulated & Leak-Proof"
+    assert product["image_urls"] == [
+        "https://m.media-amazon.com/images/I/41abcDEF01L.jpg",
+        "https://m.media-amazon.com/images/I/51ghiJKL02L.jpg",
+        "https://m.media-amazon.com/images/I/61mnoPQR03L.jpg",
+    ]
+    assert product["description"].startswith("Stay hydrated wherever you go.")
+    assert product["bullets"][:3] == [
+        "Keeps drinks cold for 24 hours and hot for 12 hours",
+        "Leak-proof lid with aone-handflip straw",
+        "BPA-free & dishwasher safeHand wash recommended",
+    ]
+    assert "Not part of the product facts" not in product["bullets"]
@@ -0,0 +1,20 @@
+import pytest
+
+from nodes.base_node import NodeContext
+from nodes.browser_node import BrowserNode
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        ({}, BrowserNode.MAX_WORKERS),
+        ({"max_workers": None}, None),
+        ({"execute_js": True}, 3),
+        ({"execute_js": True, "max_workers": 2}, 2),
+        ({"execute_js": True, "max_workers": None}, 3),
+    ],
+)
+def test_js_rendering_is_capped_by_the_driver_pool(kwargs: dict, expected: int) -> None:
+    node = BrowserNode("test", driver_pool_size=3)
+
+    assert node._get_max_workers(NodeContext("BrowserNode", kwargs)) == expected
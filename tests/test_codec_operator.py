@@ -0,0 +1,42 @@
+import io
+import json
+
+import pytest
+
+from operators.codec_operator import CodecOperator
+
+ARRAY = [123, 4.5, "x", [], {"price": -2.5e-3, "title": "é"}, True, None]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 8, 64])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_iter_array_yields_values_split_across_chunks(chunk_size: int, indent: int) -> None:
+    codec = CodecOperator()
+    codec.CHUNK_SIZE = chunk_size
+    data = json.dumps(ARRAY, indent=indent, ensure_ascii=False).encode("utf-8")
+
+    assert list(codec.iter_array(io.BytesIO(data))) == ARRAY
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"", b"{}", b"[", b"[1", b"[1,", b"[1, 2", b"[1 2]", b"[4.]",
+        b"[1,,2]", b"[,1]", b"[1,]", b"[,]", b"[1]x", b"[1] [2]",
+    ],
+)
+def test_iter_array_rejects_invalid_arrays(data: bytes) -> None:
+    codec = CodecOperator()
+    codec.CHUNK_SIZE = 2
+
+    with pytest.raises(ValueError):
+        list(codec.iter_array(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("data, expected", [(b"[]", []), (b" [ ]\n", []), (b"[1]\n", [1]), (b'[ "a" , 2 ]', ["a", 2])])
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_iter_array_accepts_whitespace_around_elements(data: bytes, expected: list, chunk_size: int) -> None:
+    codec = CodecOperator()
+    codec.CHUNK_SIZE = chunk_size
+
+    assert list(codec.iter_array(io.BytesIO(data))) == expected
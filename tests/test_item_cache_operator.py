@@ -0,0 +1,45 @@
+import os
+import pickle
+import time
+from datetime import timedelta
+
+from operators.item_cache_operator import ItemCacheOperator
+from operators.llm_cache_operator import LlmCacheOperator
+
+
+def test_results_with_the_same_payload_share_a_blob(tmp_path) -> None:
+    cache = ItemCacheOperator(os.path.join(tmp_path, "items.sqlite"), None)
+    cache.put("a", {"address": "a", "body": "same"}, "body")
+    cache.put("b", {"address": "b", "body": "same"}, "body")
+
+    assert cache.get("a") == {"address": "a", "body": "same"}
+    assert cache.get("b") == {"address": "b", "body": "same"}
+    assert cache._connect().execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 1
+
+
+def test_expired_results_are_deleted_with_their_blobs(tmp_path) -> None:
+    cache = ItemCacheOperator(os.path.join(tmp_path, "items.sqlite"), timedelta(seconds=60))
+    cache.put("a", {"body": "old"}, "body")
+    cache._connect().execute("UPDATE entries SET created_at = ?", (time.time() - 120,))
+
+    assert cache.get("a") is None
+    cache.evict()
+    assert cache._connect().execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+
+
+def test_least_recently_used_results_are_evicted_first(tmp_path) -> None:
+    cache = ItemCacheOperator(os.path.join(tmp_path, "items.sqlite"), None, max_bytes=250)
+    for key in "abc":
+        cache.put(key, {"body": key * 100}, "body")
+    cache._connect().execute("UPDATE entries SET accessed_at = ? WHERE key = 'a'", (time.time() + 60,))
+
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_caches_open_their_own_connection_after_pickling(tmp_path) -> None:
+    cache = LlmCacheOperator(os.path.join(tmp_path, "llm.sqlite"))
+    cache.put("k", "gpt-4o", "answer")
+
+    assert pickle.loads(pickle.dumps(cache)).get("k") == "answer"
@@ -0,0 +1,26 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from operators.markdown_operator import MarkdownOperator
+
+
+def convert(html: str) -> str:
+    return MarkdownOperator().convert(BeautifulSoup(html, "lxml"))
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        ("<p>a<br>b</p>", "a  \nb"),
+        ("<ul><li>one<br>two</li><li>three</li></ul>", "* one  \n  two\n* three"),
+        ("<blockquote>q<br>r</blockquote>", "> q  \n> r"),
+        ("<p>a<br></p><p>b</p>", "a\n\nb"),
+    ],
+)
+def test_br_is_a_hard_break(html: str, expected: str) -> None:
+    assert convert(html) == expected
+
+
+def test_pipes_are_escaped_in_table_cells_only() -> None:
+    html = "<p>x|y</p><table><tr><th>h|1</th></tr><tr><td>a|b</td></tr><tr><td><code>c|d</code></td></tr></table>"
+    assert convert(html) == "x|y\n\n| h\\|1 |\n| --- |\n| a\\|b |\n| `c\\|d` |"
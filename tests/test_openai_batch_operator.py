@@ -0,0 +1,63 @@
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from datatypes.markdown_type import Markdown
+from nodes.openai_node import OpenAINode
+from openai_stand_in import OpenAIStandIn
+from operators.openai_batch_operator import OpenAIBatchOperator
+
+RUN_KWARGS = {"user_prompt": "Summarize", "batch": True, "batch_poll_interval": 0.01, "response_cache": False}
+
+
+def markdowns(*bodies: str) -> List[Markdown]:
+    return [Markdown(address=f"https://example.com/{number}", body=body) for number, body in enumerate(bodies)]
+
+
+def responses(node: OpenAINode, items: List[Markdown], **kwargs) -> List[str]:
+    return [chat.response for chat in node.get_data(input_data=items, **dict(RUN_KWARGS, **kwargs))]
+
+
+def test_batch_results_are_mapped_back_in_input_order(
+        openai_stand_in: OpenAIStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(OpenAIBatchOperator, "MAX_REQUESTS_PER_BATCH", 2)
+    items = markdowns(*(f"body {number:03d}" for number in range(5)))
+
+    assert responses(OpenAINode("test"), items, item_cache=False) == [f"B:{number:03d}" for number in range(5)]
+    assert len(openai_stand_in.batches) == 3
+    assert openai_stand_in.chat_requests == []
+
+
+def test_failed_and_missing_results_fall_back_to_synchronous_calls(openai_stand_in: OpenAIStandIn) -> None:
+    items = markdowns("body 000", "FAIL 001", "body 002", "MISSING 003")
+
+    assert responses(OpenAINode("test"), items, item_cache=False) == ["B:000", "S:001", "B:002", "S:003"]
+    assert len(openai_stand_in.chat_requests) == 2
+
+
+def test_completed_results_are_kept_when_the_timeout_cancels_a_batch(
+        openai_stand_in: OpenAIStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(OpenAIBatchOperator, "CANCEL_GRACE", timedelta(seconds=5))
+    openai_stand_in.polls_to_complete = None
+    openai_stand_in.completed_before_cancel = 2
+    items = markdowns(*(f"body {number:03d}" for number in range(4)))
+
+    result = responses(OpenAINode("test"), items, item_cache=False, batch_timeout=0.05)
+
+    assert result == ["B:000", "B:001", "S:002", "S:003"]
+    assert openai_stand_in.cancelled == ["batch-0"]
+
+
+def test_items_the_item_cache_answers_are_not_batched(openai_stand_in: OpenAIStandIn) -> None:
+    node = OpenAINode("test")
+    items = markdowns(*(f"body {number:03d}" for number in range(5)))
+    assert responses(node, items[:4], batch=False) == [f"S:{number:03d}" for number in range(4)]
+
+    # A new input, so the run is not served from the output folder of the first one.
+    result = responses(node, items[:3] + items[4:])
+
+    assert result == ["S:000", "S:001", "S:002", "B:004"]
+    assert [request["body"]["messages"][-1]["content"][-3:] for request in openai_stand_in.batch_requests()] == ["004"]
@@ -0,0 +1,37 @@
+from typing import List
+
+from datatypes.markdown_type import Markdown
+from nodes.openai_node import OpenAINode
+from openai_stand_in import OpenAIStandIn
+
+RUN_KWARGS = {"user_prompt": "Summarize", "response_cache": False}
+
+
+def markdowns(count: int) -> List[Markdown]:
+    return [Markdown(address=f"https://example.com/{number}", body=f"body {number:03d}") for number in range(count)]
+
+
+def responses(node: OpenAINode, items: List[Markdown], **kwargs) -> List[str]:
+    return [chat.response for chat in node.get_data(input_data=items, **dict(RUN_KWARGS, **kwargs))]
+
+
+def test_prompts_are_packed_and_answered_in_input_order(openai_stand_in: OpenAIStandIn) -> None:
+    result = responses(OpenAINode("test"), markdowns(5), pack=True, pack_max_items=3, item_cache=False)
+
+    assert result == [f"P:{number:03d}" for number in range(5)]
+    assert len(openai_stand_in.chat_requests) == 2
+
+
+def test_items_the_item_cache_answers_are_not_packed(openai_stand_in: OpenAIStandIn) -> None:
+    node = OpenAINode("test")
+    items = markdowns(6)
+    assert responses(node, items[:4]) == [f"S:{number:03d}" for number in range(4)]
+    openai_stand_in.chat_requests.clear()
+
+    # New inputs, so the runs are not served from the output folder of the first one.
+    assert responses(node, items[3::-1], pack=True) == [f"S:{number:03d}" for number in range(3, -1, -1)]
+    assert openai_stand_in.chat_requests == []
+
+    assert responses(node, items[:3] + items[4:], pack=True) == ["S:000", "S:001", "S:002", "P:004", "P:005"]
+    assert len(openai_stand_in.chat_requests) == 1
+    assert "Below are 2 separate items" in openai_stand_in.chat_requests[0]["messages"][-1]["content"]
@@ -0,0 +1,86 @@
+from typing import List, Optional, Tuple
+
+import openai
+import pytest
+
+from nodes.openai_node import OpenAINode
+from openai_stand_in import OpenAIStandIn
+from operators.rate_limit_operator import RateLimitOperator, parse_duration
+
+REQUEST = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "body 000"}], "max_tokens": 10}
+
+
+class RecordingLimiter(RateLimitOperator):
+    """A limiter with short backoff delays that records every backoff."""
+
+    def __init__(self, **kwargs):
+        super().__init__(base_delay=0.01, max_delay=0.05, **kwargs)
+        self.backoffs: List[Tuple[int, Optional[str], float]] = []
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = super().backoff(attempt, retry_after)
+        self.backoffs.append((attempt, retry_after, delay))
+        return delay
+
+
+@pytest.fixture
+def node(openai_stand_in: OpenAIStandIn) -> OpenAINode:
+    node = OpenAINode("test")
+    node._rate_limiter = RecordingLimiter()
+    return node
+
+
+def test_rejected_calls_are_retried_after_retry_after(node: OpenAINode, openai_stand_in: OpenAIStandIn) -> None:
+    openai_stand_in.chat_script = [(429, {"retry-after": "0.2"}), (429, {})]
+    openai_stand_in.chat_headers = {"x-ratelimit-remaining-requests": "99", "x-ratelimit-reset-requests": "1s"}
+
+    completion = node._create_chat_completion(**REQUEST)
+
+    assert completion.choices[0].message.content == "S:000"
+    assert len(openai_stand_in.chat_requests) == 3
+    backoffs = node._rate_limiter.backoffs
+    assert [(attempt, retry_after) for attempt, retry_after, _ in backoffs] == [(0, "0.2"), (1, None)]
+    first_delay, second_delay = (delay for _, _, delay in backoffs)
+    # The server delay wins over the shorter backoff, which doubles per attempt within its jitter.
+    assert first_delay == 0.2
+    assert 0.01 <= second_delay <= 0.02
+    times = openai_stand_in.chat_times
+    assert times[1] - times[0] >= 0.2
+    assert times[2] - times[1] >= 0.01
+
+
+def test_retries_stop_after_max_retries(
+        node: OpenAINode, openai_stand_in: OpenAIStandIn, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(OpenAINode, "MAX_RETRIES", 2)
+    openai_stand_in.chat_script = [(429, {"retry-after": "0"})] * 3
+
+    with pytest.raises(openai.RateLimitError):
+        node._create_chat_completion(**REQUEST)
+    assert len(openai_stand_in.chat_requests) == 3
+    assert [attempt for attempt, _, _ in node._rate_limiter.backoffs] == [0, 1]
+
+
+def test_exhausted_budget_headers_pause_the_next_call(node: OpenAINode, openai_stand_in: OpenAIStandIn) -> None:
+    exhausted = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "300ms"}
+    openai_stand_in.chat_script = [(200, exhausted)]
+
+    node._create_chat_completion(**REQUEST)
+    node._create_chat_completion(**REQUEST)
+
+    times = openai_stand_in.chat_times
+    assert times[1] - times[0] >= 0.29
+    assert node._rate_limiter.backoffs == []
+
+
+@pytest.mark.parametrize("value, seconds", [("20ms", 0.02), ("1s", 1.0), ("6m0s", 360.0), ("1.5", 1.5), ("", None)])
+def test_parse_duration(value: str, seconds: Optional[float]) -> None:
+    assert parse_duration(value) == seconds
+
+
+def test_backoff_doubles_up_to_the_maximum() -> None:
+    limiter = RateLimitOperator(base_delay=1.0, max_delay=6.0)
+
+    assert 2.0 <= limiter.backoff(2) <= 4.0
+    assert 3.0 <= limiter.backoff(5) <= 6.0
+    assert limiter.backoff(0, "10") == 10.0
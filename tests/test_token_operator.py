@@ -0,0 +1,26 @@
+import pytest
+
+from operators.token_operator import TokenOperator
+
+
+@pytest.fixture
+def estimator() -> TokenOperator:
+    counter = TokenOperator("gpt-3.5-turbo")
+    counter._encoding = None
+    return counter
+
+
+def test_estimate_allows_fewer_than_three_characters_per_token(estimator: TokenOperator) -> None:
+    text = "[link](https://example.com/a/b?c=d) " * 100
+
+    assert estimator.count(text) > len(text) / 3
+
+
+@pytest.mark.parametrize("max_tokens", [1, 7, 100])
+def test_split_chunks_fit_the_estimate(estimator: TokenOperator, max_tokens: int) -> None:
+    text = "\n\n".join(f"Paragraph {number}: " + "word " * number for number in range(60))
+
+    chunks = estimator.split(text, max_tokens)
+
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+    assert all(estimator.count(chunk) <= max_tokens for chunk in chunks)